@@ -1,57 +1,139 @@
-import timeit
-import numpy as np
+from typing import Optional
 
-from src.hungryryan import run_hungryryan
-from src.helpers.input_handler import generate_input
+from src.helpers.input_handler import generate_input, read_input
 from src.helpers.output_handler import write_to_output
-from src.helpers.plot import display_output, display_time_complexity
 from src.helpers.arguments_parser import ApplicationMode, parse_arguments
+from src.helpers.result_cache import ResultCache
+from src.models.graph import InitialGraph
+from src.models.matching import Matching
+
+# Solvers, benchmarks and plotting (matplotlib) are imported only by the modes using them,
+# so that modes which do not need them start fast
+
+
+def render_matching(initial_graph: InitialGraph, matching: Matching, no_render: bool = False, save_plot: Optional[str] = None) -> None:
+    if save_plot is not None:
+        from src.helpers.plot import save_matching
+        print('[INFO] Output saved. Saving final image...')
+        save_matching(initial_graph, matching, save_plot)
+        print(f'[INFO] Image saved to {save_plot}.')
+    elif not no_render:
+        from src.helpers.plot import display_matching
+        print('[INFO] Output saved. Rendering final image...')
+        display_matching(initial_graph, matching)
+
+
+def run_input_file(input_file: str,
+                   output_file: str,
+                   solver: str,
+                   statistics: bool = False,
+                   no_render: bool = False,
+                   save_plot: Optional[str] = None,
+                   cache: Optional[ResultCache] = None) -> None:
+    from src.hungryryan import solve_input
+    from src.models.solver_statistics import SolverStatistics
+
+    print('[INFO] Starting Hungarian Algorithm...')
+    solution = solve_input(input_file, solver, SolverStatistics() if statistics else None, cache)
+    print(solution.reflected_total)
+    if statistics:
+        print(f'[INFO] Solver statistics: {solution.statistics.as_dict()}')
+    print('[INFO] Finished. Saving output...')
+    write_to_output(solution.initial_graph, solution.matching, output_file)
+    render_matching(solution.initial_graph, solution.matching, no_render, save_plot)
 
 
 def main():
     args = parse_arguments()
     selected_mode = ApplicationMode.from_str(args.mode)
+    cache = ResultCache(args.cache_directory, args.cache_bytes) if args.cache_directory is not None else None
 
     if selected_mode == ApplicationMode.GENERATE_INPUT:
-        generate_input(args.n, args.k, args.input_file)
+        generate_input(args.n, args.k, args.input_file, args.family, args.seed)
         print('[INFO] Input file generated.')
 
     elif selected_mode == ApplicationMode.GENERATE_AND_RUN:
-        generate_input(args.n, args.k, args.input_file)
+        generate_input(args.n, args.k, args.input_file, args.family, args.seed)
         print('[INFO] Input file generated.')
-        print('[INFO] Starting Hungarian Algorithm...')
-        graph, matching = run_hungryryan(args.input_file)
-        print('[INFO] Finished. Saving output...')
-        write_to_output(graph, matching, args.output_file)
-        print('[INFO] Output saved. Rendering final image...')
-        display_output(graph.n, graph.k, args.output_file)
+        run_input_file(args.input_file, args.output_file, args.solver, args.statistics, args.no_render, args.save_plot, cache)
 
     elif selected_mode == ApplicationMode.READ_INPUT:
-        print('[INFO] Starting Hungarian Algorithm...')
-        graph, matching = run_hungryryan(args.input_file)
-        print('[INFO] Finished. Saving output...')
-        write_to_output(graph, matching, args.output_file)
-        print('[INFO] Output saved. Rendering final image...')
-        display_output(graph.n, graph.k, args.output_file)
+        run_input_file(args.input_file, args.output_file, args.solver, args.statistics, args.no_render, args.save_plot, cache)
 
     elif selected_mode == ApplicationMode.BENCHMARK:
-        measurements = np.zeros((args.n, args.k))
+        from src.benchmark.results import measurements_grid, write_results
+        from src.benchmark.runner import run_benchmark
+
         print('[INFO] Starting Hungarian Algorithm Benchmarking...')
-        for n in range(1, args.n + 1):
-            for k in range(1, args.k + 1):
-                input_file = f"./Tests/input_test_{n}_{k}.txt"
-                output_file = f"./Tests/output_test_benchmark.txt"
-                generate_input(n, k, input_file)
-                print(f'[INFO] Input generated - {n} wells, {k} houses per well')
-                print('[INFO] Measuring Hungarian Algorithm execution time...')
-                measurement = timeit.timeit(
-                    lambda: run_hungryryan(input_file),
-                    number=1
-                )
-                measurements[n-1, k-1] = measurement
-                print(f'Time measured: {round(measurement * 100, 2)} seconds.')
-        print('[INFO] Benchmarking finished.  Rendering time complexity chart...')
-        display_time_complexity(args.n, args.k, measurements, logarithmic=False)
+        sizes = [(n, k) for n in range(1, args.n + 1) for k in range(1, args.k + 1)]
+        records = run_benchmark(
+            sizes, [args.solver], [args.family], args.seed if args.seed is not None else 0, args.repeats, args.warmup,
+            workers=args.workers if args.workers is not None else 1, pin_cpus=args.pin_cpus, input_directory=args.input_directory
+        )
+        write_results(records, args.benchmark_file)
+        print(f'[INFO] Benchmarking finished. Results saved to {args.benchmark_file}.')
+        measurements = measurements_grid(records, args.n, args.k)
+        if args.save_plot is not None:
+            from src.helpers.plot import save_time_complexity
+            save_time_complexity(args.n, args.k, measurements, args.save_plot, logarithmic=False)
+            print(f'[INFO] Time complexity chart saved to {args.save_plot}.')
+        elif not args.no_render:
+            from src.helpers.plot import display_time_complexity
+            print('[INFO] Rendering time complexity chart...')
+            display_time_complexity(args.n, args.k, measurements, logarithmic=False)
+
+    elif selected_mode == ApplicationMode.BENCHMARK_COMPARE:
+        from src.benchmark.results import CASE_KEYS, compare_results, read_results
+
+        regressions = compare_results(read_results(args.baseline_file), read_results(args.benchmark_file), args.threshold)
+        for case, phase, baseline_median, median in regressions:
+            print(f'[WARN] Regression {dict(zip(CASE_KEYS, case))} {phase}: {round(baseline_median, 6)} -> {round(median, 6)} seconds')
+        print(f'[INFO] Comparison finished, {len(regressions)} regression(s) found.')
+        if regressions:
+            raise SystemExit(1)
+
+    elif selected_mode == ApplicationMode.CONVERT_INPUT:
+        from src.helpers.input_handler import convert_input
+
+        convert_input(args.input_file, args.output_file)
+        print('[INFO] Input file converted.')
+
+    elif selected_mode == ApplicationMode.SOLVE_MANY:
+        from src.batch import solve_many
+
+        print('[INFO] Starting batch solving...')
+        failed = 0
+        for result in solve_many(args.input_file, args.solver, args.workers, args.output_directory, cache):
+            if result.succeeded:
+                print(f'[INFO] {result.input_file}: {result.precise_total_cost} ({round(result.seconds, 3)} seconds)')
+            else:
+                failed += 1
+                print(f'[ERROR] {result.input_file}: {result.error}')
+        print(f'[INFO] Batch finished, {failed} instance(s) failed.')
+
+    elif selected_mode == ApplicationMode.APPROXIMATE:
+        from src.models.solution import Solution
+        from src.solvers.partitioned import solve_partitioned
+
+        print('[INFO] Starting approximate solving...')
+        initial_graph = read_input(args.input_file)
+        matching, lower_bound = solve_partitioned(initial_graph, args.cell_wells, args.cell_solver, args.workers)
+        solution = Solution(initial_graph, matching, lower_bound=lower_bound)
+        print(f'[INFO] Total cost: {solution.total_cost}, lower bound: {lower_bound}, gap: {round(100 * solution.optimality_gap, 3)}%')
+        print('[INFO] Finished. Saving output...')
+        write_to_output(initial_graph, matching, args.output_file)
+        render_matching(initial_graph, matching, args.no_render, args.save_plot)
+
+    elif selected_mode == ApplicationMode.HEURISTIC:
+        from src.solvers.heuristic import solve_heuristic
+
+        print('[INFO] Starting heuristic solving...')
+        initial_graph = read_input(args.input_file)
+        result = solve_heuristic(initial_graph, args.time_budget)
+        print(f'[INFO] Total cost: {result.total_cost} after {result.passes} improvement pass(es) with {result.exchanges} exchange(s)')
+        print('[INFO] Finished. Saving output...')
+        write_to_output(initial_graph, result.matching, args.output_file)
+        render_matching(initial_graph, result.matching, args.no_render, args.save_plot)
 
 if __name__ == "__main__":
     main()
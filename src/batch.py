@@ -0,0 +1,171 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, Optional, Union
+
+from src.hungryryan import solve_input
+from src.helpers.input_handler import read_input_size
+from src.helpers.output_handler import write_to_output
+from src.helpers.result_cache import ResultCache
+from src.models.matching import Matching
+from src.solvers.registry import DEFAULT_SOLVER
+
+# Number of times unfinished instances are submitted to a fresh shared pool after a worker process died
+BATCH_RESUBMISSIONS = 1
+
+
+class BatchResult():
+    '''
+    Class represents result of solving a single instance of the batch. Only the matching
+    and totals are sent back from the worker process, not the whole Solution with its graph.
+
+    Attributes:
+    ----------
+    input_file : str
+        name of the solved input file
+    matching : Matching
+        optimal matching of the instance, None if solving failed
+    total_cost : int
+        sum of integer distances (in hundredths) of the assigned pairs, None if solving failed
+    precise_total_cost : float
+        sum of precise distances of the assigned pairs, None if solving failed
+    seconds : float
+        time spent on reading, solving and writing the instance
+    error : str
+        description of the exception which stopped solving, None if solving succeeded
+    '''
+
+    def __init__(self,
+                 input_file: str,
+                 matching: Optional[Matching],
+                 total_cost: Optional[int],
+                 precise_total_cost: Optional[float],
+                 seconds: float,
+                 error: Optional[str] = None) -> None:
+        self.input_file = input_file
+        self.matching = matching
+        self.total_cost = total_cost
+        self.precise_total_cost = precise_total_cost
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def solve_instance(input_file: str,
+                   solver: str = DEFAULT_SOLVER,
+                   output_directory: Optional[str] = None,
+                   cache: Optional[ResultCache] = None) -> BatchResult:
+    '''
+    Method solves a single instance of the batch. Exceptions are not propagated, but
+    stored in the result, so that a bad input does not stop the rest of the batch.
+
+    Parameters:
+    ----------
+    input_file : str
+        name of the input file
+    solver : str, optional
+        name of the solver backend, by default DEFAULT_SOLVER
+    output_directory : str, optional
+        directory to which output file "output_<input file name>.txt" is written,
+        nothing is written by default
+    cache : ResultCache, optional
+        cache of solutions shared by the workers, by default nothing is cached
+    '''
+    start = time.perf_counter()
+    try:
+        solution = solve_input(input_file, solver, cache=cache)
+        if output_directory is not None:
+            name = os.path.splitext(os.path.basename(input_file))[0]
+            write_to_output(solution.initial_graph, solution.matching, os.path.join(output_directory, f"output_{name}.txt"))
+        return BatchResult(input_file, solution.matching, solution.total_cost, solution.precise_total_cost, time.perf_counter() - start)
+    except Exception as error:
+        return BatchResult(input_file, None, None, None, time.perf_counter() - start, f"{type(error).__name__}: {error}")
+
+
+def list_instances(inputs: Union[str, Iterable[str]]) -> List[str]:
+    '''
+    Method lists input files of the batch - all files of the directory (in name order)
+    or given input files.
+    '''
+    if isinstance(inputs, str):
+        if not os.path.isdir(inputs):
+            return [inputs]
+        return [os.path.join(inputs, name) for name in sorted(os.listdir(inputs)) if os.path.isfile(os.path.join(inputs, name))]
+    return list(inputs)
+
+
+def instance_size(input_file: str) -> int:
+    '''
+    Returns number of houses of the instance, 0 if its header cannot be read.
+    '''
+    try:
+        n, k = read_input_size(input_file)
+        return n * k
+    except Exception:
+        return 0
+
+
+def solve_many(inputs: Union[str, Iterable[str]],
+               solver: str = DEFAULT_SOLVER,
+               workers: Optional[int] = None,
+               output_directory: Optional[str] = None,
+               cache: Optional[ResultCache] = None) -> Iterator[BatchResult]:
+    '''
+    Method solves many independent instances in a pool of processes. Instances are
+    submitted largest first for load balance and results are yielded as soon as each
+    instance is finished. If a worker process dies (e.g. runs out of memory), the pool
+    is broken and instances not finished yet are submitted to a fresh pool. After
+    BATCH_RESUBMISSIONS such resubmissions the remaining instances are solved each in its
+    own pool and the instance whose worker dies again is reported as failed.
+
+    Parameters:
+    ----------
+    inputs : Union[str, Iterable[str]]
+        directory with input files, single input file or list of input files
+    solver : str, optional
+        name of the solver backend, by default DEFAULT_SOLVER
+    workers : int, optional
+        number of worker processes, by default number of processors
+    output_directory : str, optional
+        directory to which outputs are written, nothing is written by default
+    cache : ResultCache, optional
+        cache of solutions, by default nothing is cached
+
+    Returns:
+    -------
+    Iterator over results in the order of completion.
+    '''
+    instances = sorted(list_instances(inputs), key=instance_size, reverse=True)
+    if output_directory is not None:
+        os.makedirs(output_directory, exist_ok=True)
+
+    pending, resubmissions = instances, 0
+    while pending:
+        # after repeated failures every instance gets its own pool, so that an instance
+        # killing its worker cannot fail the others
+        isolated = resubmissions > BATCH_RESUBMISSIONS
+        broken = set()
+        for group in ([[input_file] for input_file in pending] if isolated else [pending]):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(solve_instance, input_file, solver, output_directory, cache): input_file
+                    for input_file in group
+                }
+                for future in as_completed(futures):
+                    input_file = futures[future]
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool as error:
+                        if isolated:
+                            yield BatchResult(input_file, None, None, None, 0.0, f"{type(error).__name__}: {error}")
+                        else:
+                            broken.add(input_file)
+                    except Exception as error:
+                        yield BatchResult(input_file, None, None, None, 0.0, f"{type(error).__name__}: {error}")
+
+        pending = [input_file for input_file in pending if input_file in broken]
+        resubmissions += 1
@@ -0,0 +1,191 @@
+import zlib
+import numpy as np
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.helpers.input_handler import INPUT_CHUNK_POINTS, round_coordinates
+from src.models.graph import InitialGraph
+
+# Family gives coordinates of wells and an iterator over chunks of coordinates of houses
+Family = Callable[[np.random.Generator, int, int], Tuple[np.ndarray, Iterator[np.ndarray]]]
+
+# Side of the square area in which instances are generated, as in generate_input
+AREA_SIZE = 10
+# Side of the area of the "wide" family, which requires 32-bit costs
+WIDE_AREA_SIZE = 1000
+# Exponent of the "skewed" family, the density of houses grows towards the origin with it
+SKEW_EXPONENT = 3
+# Width of streets of the "roads" family as a fraction of the distance between streets
+ROAD_WIDTH = 0.05
+
+
+def chunk_sizes(count: int) -> Iterator[int]:
+    '''
+    Yields sizes of consecutive chunks of count points.
+    '''
+    for start in range(0, count, INPUT_CHUNK_POINTS):
+        yield min(INPUT_CHUNK_POINTS, count - start)
+
+
+def uniform(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Wells and houses uniformly distributed over the area (distribution of generate_input).
+    '''
+    wells = rng.random((n, 2)) * AREA_SIZE
+    return wells, (rng.random((size, 2)) * AREA_SIZE for size in chunk_sizes(n * k))
+
+
+def clustered(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Uniformly distributed wells, each surrounded by a normally distributed cluster of houses.
+    '''
+    wells = rng.random((n, 2)) * AREA_SIZE
+    spread = AREA_SIZE / (4 * np.sqrt(max(n, 1)))
+    step = max(1, INPUT_CHUNK_POINTS // max(k, 1))
+
+    def houses():
+        for start in range(0, n, step):
+            centers = np.repeat(wells[start:start + step], k, axis=0)
+            yield np.clip(centers + rng.normal(scale=spread, size=centers.shape), 0, AREA_SIZE)
+
+    return wells, houses()
+
+
+def mixture(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Wells and houses drawn from the same mixture of gaussian clusters (towns) of random
+    sizes and spreads, so that both are dense in the towns and sparse between them.
+    '''
+    towns = max(1, int(np.sqrt(n)))
+    centers = rng.random((towns, 2)) * AREA_SIZE
+    spreads = AREA_SIZE / (2 * np.sqrt(towns)) * rng.uniform(0.1, 1, towns)
+    weights = rng.dirichlet(np.ones(towns))
+
+    def points(size):
+        town = rng.choice(towns, size, p=weights)
+        return np.clip(centers[town] + rng.normal(size=(size, 2)) * spreads[town, np.newaxis], 0, AREA_SIZE)
+
+    wells = points(n)
+    return wells, (points(size) for size in chunk_sizes(n * k))
+
+
+def roads(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Wells uniformly distributed, houses placed along a grid of randomly spaced streets.
+    '''
+    wells = rng.random((n, 2)) * AREA_SIZE
+    streets_count = max(2, int(np.sqrt(n)))
+    streets = np.sort(rng.random((2, streets_count)) * AREA_SIZE, axis=1)
+    width = ROAD_WIDTH * AREA_SIZE / streets_count
+
+    def points(size):
+        # houses lie along horizontal (axis 0) or vertical (axis 1) streets
+        axis = rng.integers(0, 2, size)
+        street = rng.integers(0, streets_count, size)
+        along = rng.random(size) * AREA_SIZE
+        across = streets[1 - axis, street] + rng.normal(scale=width, size=size)
+        coordinates = np.where(axis[:, np.newaxis] == 0, np.column_stack([along, across]), np.column_stack([across, along]))
+        return np.clip(coordinates, 0, AREA_SIZE)
+
+    return wells, (points(size) for size in chunk_sizes(n * k))
+
+
+def skewed(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Uniformly distributed wells and houses crowded towards one corner of the area, so
+    that wells near the corner cannot serve all nearby houses.
+    '''
+    wells = rng.random((n, 2)) * AREA_SIZE
+    return wells, (rng.random((size, 2)) ** SKEW_EXPONENT * AREA_SIZE for size in chunk_sizes(n * k))
+
+
+def integer(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Wells and houses on a coarse integer lattice, which produces many equal costs.
+    '''
+    side = max(2, int(np.sqrt(n * k)))
+    wells = rng.integers(0, side, (n, 2)).astype(float)
+    return wells, (rng.integers(0, side, (size, 2)).astype(float) for size in chunk_sizes(n * k))
+
+
+def wide(rng: np.random.Generator, n: int, k: int) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Uniform distribution over an area too wide for 16-bit costs.
+    '''
+    wells = rng.random((n, 2)) * WIDE_AREA_SIZE
+    return wells, (rng.random((size, 2)) * WIDE_AREA_SIZE for size in chunk_sizes(n * k))
+
+
+FAMILIES: Dict[str, Family] = {
+    "uniform": uniform,
+    "clustered": clustered,
+    "mixture": mixture,
+    "roads": roads,
+    "skewed": skewed,
+    "integer": integer,
+    "wide": wide,
+}
+
+
+def available_families() -> List[str]:
+    '''
+    Method returns names of all instance families.
+    '''
+    return list(FAMILIES)
+
+
+def generate_chunks(family: str, n: int, k: int, seed: Optional[int] = 0) -> Tuple[np.ndarray, Iterator[np.ndarray]]:
+    '''
+    Method generates instance of given family without holding coordinates of all houses
+    in memory. The same (family, n, k, seed) always gives the same instance, coordinates
+    are rounded to 2 decimal places as in input files.
+
+    Parameters:
+    ----------
+    family : str
+        name of the instance family
+    n : int
+        number of wells
+    k : int
+        number of houses per well
+    seed : int, optional
+        seed of the family, by default 0, None if the instance should be random
+
+    Returns:
+    -------
+    Tuple (coordinates of wells, iterator over chunks of at most INPUT_CHUNK_POINTS
+    coordinates of houses). Chunks are generated while iterating.
+    '''
+    if family not in FAMILIES:
+        raise NotImplementedError(f"{family} instance family not implemented")
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    rng = np.random.default_rng([seed, n, k, zlib.crc32(family.encode())])
+    wells_coordinates, houses_chunks = FAMILIES[family](rng, n, k)
+
+    return round_coordinates(wells_coordinates), (round_coordinates(chunk) for chunk in houses_chunks)
+
+
+def generate_instance(family: str, n: int, k: int, seed: Optional[int] = 0) -> InitialGraph:
+    '''
+    Method generates instance of given family in memory (see generate_chunks).
+
+    Parameters:
+    ----------
+    family : str
+        name of the instance family
+    n : int
+        number of wells
+    k : int
+        number of houses per well
+    seed : int, optional
+        seed of the family, by default 0, None if the instance should be random
+
+    Returns:
+    -------
+    Generated graph.
+    '''
+    wells_coordinates, houses_chunks = generate_chunks(family, n, k, seed)
+    houses_coordinates = np.concatenate([np.empty((0, 2)), *houses_chunks])
+
+    return InitialGraph(n, k, wells_coordinates, houses_coordinates)
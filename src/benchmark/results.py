@@ -0,0 +1,119 @@
+import csv
+import json
+import platform
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from src.models.constants import MIN_COMPARED_SECONDS
+
+# Columns identifying a benchmarked case
+CASE_KEYS = ("family", "n", "k", "seed", "solver")
+# Statistics stored for every phase
+STATISTICS = ("median", "q1", "q3", "iqr", "min", "max")
+
+
+def write_results(records: List[dict], results_file: str) -> None:
+    '''
+    Method stores benchmark records. Files ending with ".csv" get one row per (case, phase),
+    other files are written as JSON together with description of the environment.
+    '''
+    if results_file.endswith(".csv"):
+        with open(results_file, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CASE_KEYS + ("repeats", "warmup", "phase") + STATISTICS)
+            for record in records:
+                for phase, summary in record["phases"].items():
+                    writer.writerow(
+                        [record[key] for key in CASE_KEYS + ("repeats", "warmup")] + [phase] + [summary[statistic] for statistic in STATISTICS]
+                    )
+        return
+
+    with open(results_file, "w") as file:
+        json.dump({
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "records": records,
+        }, file, indent=2)
+
+
+def read_results(results_file: str) -> List[dict]:
+    '''
+    Method reads benchmark records stored by write_results (in any format).
+    '''
+    if not results_file.endswith(".csv"):
+        with open(results_file, "r") as file:
+            return json.load(file)["records"]
+
+    records: Dict[tuple, dict] = {}
+    with open(results_file, "r", newline="") as file:
+        for row in csv.DictReader(file):
+            case = tuple(row[key] for key in CASE_KEYS)
+            record = records.setdefault(case, {
+                "family": row["family"],
+                "n": int(row["n"]),
+                "k": int(row["k"]),
+                "seed": int(row["seed"]),
+                "solver": row["solver"],
+                "repeats": int(row["repeats"]),
+                "warmup": int(row["warmup"]),
+                "phases": {},
+            })
+            record["phases"][row["phase"]] = {statistic: float(row[statistic]) for statistic in STATISTICS}
+    return list(records.values())
+
+
+def measurements_grid(records: List[dict], n: int, k: int, phase: str = "total", statistic: str = "median") -> np.ndarray:
+    '''
+    Method arranges given statistic of a phase of the records into a grid indexed by
+    (n - 1, k - 1), as consumed by display_time_complexity. Sizes without a record are 0,
+    if more records have the same size (e.g. of different solvers), the last one is used.
+    '''
+    grid = np.zeros((n, k))
+    for record in records:
+        if record["n"] <= n and record["k"] <= k:
+            grid[record["n"] - 1, record["k"] - 1] = record["phases"][phase][statistic]
+    return grid
+
+
+def compare_results(baseline: List[dict], current: List[dict], threshold: float = 0.1) -> List[Tuple[tuple, str, float, float]]:
+    '''
+    Method finds regressions between two benchmark results. Phase of a case regressed if
+    its median grew by more than threshold (relatively) and by more than the interquartile
+    range of the baseline, so that noise is not reported. Slowdowns smaller than
+    MIN_COMPARED_SECONDS are timer jitter and are not reported either. Cases present in
+    only one of the results are skipped.
+
+    Parameters:
+    ----------
+    baseline : List[dict]
+        records of the reference benchmark
+    current : List[dict]
+        records of the compared benchmark
+    threshold : float, optional
+        allowed relative slowdown of the median, by default 0.1
+
+    Returns:
+    -------
+    List of regressions (case, phase, baseline median, current median).
+    '''
+    baseline_cases = {tuple(record[key] for key in CASE_KEYS): record for record in baseline}
+
+    regressions = []
+    for record in current:
+        case = tuple(record[key] for key in CASE_KEYS)
+        if case not in baseline_cases:
+            continue
+
+        for phase, summary in record["phases"].items():
+            reference = baseline_cases[case]["phases"].get(phase)
+            if reference is None:
+                continue
+
+            slowdown = summary["median"] - reference["median"]
+            if slowdown > threshold * reference["median"] and slowdown > reference["iqr"] and slowdown > MIN_COMPARED_SECONDS:
+                regressions.append((case, phase, reference["median"], summary["median"]))
+
+    return regressions
@@ -0,0 +1,240 @@
+import os
+import time
+import tempfile
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.hungryryan import duplicate_wells
+from src.helpers.input_handler import generate_input, read_input
+from src.helpers.output_handler import write_to_output
+from src.solvers.registry import DEFAULT_SOLVER, get_solver, solves_initial_graph
+
+# Measured phases of a single run, "total" is their sum
+PHASES = ("parse", "duplicate_wells", "compute_distances", "solve", "output")
+
+
+class PhaseTimer():
+    '''
+    Class measures time of (possibly nested) phases. Time of a nested phase is not
+    counted into the enclosing one, so times of all phases sum up to the total time.
+
+    Attributes:
+    ----------
+    times : Dict[str, float]
+        exclusive time in seconds of every phase
+    '''
+
+    def __init__(self) -> None:
+        self.times: Dict[str, float] = {}
+        self.nested: List[float] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        self.nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.nested.pop()
+            self.times[name] = self.times.get(name, 0.0) + elapsed - nested
+            if self.nested:
+                self.nested[-1] += elapsed
+
+
+def measure_run(input_file: str, output_file: str, solver: str = DEFAULT_SOLVER) -> Dict[str, float]:
+    '''
+    Method runs the whole pipeline once and measures time of its phases.
+
+    Returns:
+    -------
+    Dictionary with time in seconds of every phase of PHASES and their "total".
+    '''
+    solve = get_solver(solver)
+    timer = PhaseTimer()
+
+    with timer.phase("parse"):
+        initial_graph = read_input(input_file)
+
+    if solves_initial_graph(solver):
+        with timer.phase("solve"):
+            matching = solve(initial_graph)
+    else:
+        with timer.phase("duplicate_wells"):
+            graph = duplicate_wells(initial_graph, compute_distances=False)
+        with timer.phase("compute_distances"):
+            graph.compute_distances()
+        with timer.phase("solve"):
+            matching = solve(graph)
+
+    with timer.phase("output"):
+        write_to_output(initial_graph, matching, output_file)
+
+    times = {phase: timer.times.get(phase, 0.0) for phase in PHASES}
+    times["total"] = sum(times.values())
+    return times
+
+
+def summarize(measurements: List[float]) -> Dict[str, float]:
+    '''
+    Returns median, quartiles, interquartile range and extremes of the measurements.
+    '''
+    q1, median, q3 = np.percentile(measurements, [25, 50, 75])
+    return {
+        "median": float(median),
+        "q1": float(q1),
+        "q3": float(q3),
+        "iqr": float(q3 - q1),
+        "min": float(np.min(measurements)),
+        "max": float(np.max(measurements)),
+    }
+
+
+def cached_input(family: str, n: int, k: int, seed: int, input_directory: str) -> str:
+    '''
+    Method returns input file of the seeded instance stored in input_directory, the
+    instance is generated only if the file does not exist yet. File is written under a
+    temporary name and renamed, so that concurrent workers never read a partial file.
+    '''
+    input_file = os.path.join(input_directory, f"input_{family}_{n}_{k}_{seed}.txt")
+    if not os.path.exists(input_file):
+        temporary_file = f"{input_file}.{os.getpid()}.tmp"
+        generate_input(n, k, temporary_file, family, seed)
+        os.replace(temporary_file, input_file)
+    return input_file
+
+
+def benchmark_instance(family: str,
+                       n: int,
+                       k: int,
+                       seed: int,
+                       solvers: List[str],
+                       repeats: int,
+                       warmup: int,
+                       input_directory: str,
+                       verbose: bool = True) -> List[dict]:
+    '''
+    Method benchmarks all solvers on a single seeded instance (run in worker process).
+    Outputs are written into a private temporary directory of the instance.
+
+    Returns:
+    -------
+    List of records, one per solver.
+    '''
+    input_file = cached_input(family, n, k, seed, input_directory)
+
+    records = []
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, "output.txt")
+
+        for solver in solvers:
+            if verbose:
+                print(f'[INFO] Benchmark -> family: {family}, N: {n}, K: {k}, solver: {solver}')
+
+            for _ in range(warmup):
+                measure_run(input_file, output_file, solver)
+            runs = [measure_run(input_file, output_file, solver) for _ in range(max(repeats, 1))]
+
+            records.append({
+                "family": family,
+                "n": n,
+                "k": k,
+                "seed": seed,
+                "solver": solver,
+                "repeats": len(runs),
+                "warmup": warmup,
+                "phases": {phase: summarize([run[phase] for run in runs]) for phase in runs[0]},
+            })
+
+    return records
+
+
+def pin_worker(cpus) -> None:
+    '''
+    Pins worker process to a single processor taken from the queue cpus, so that it is
+    not migrated between processors while measuring.
+    '''
+    os.sched_setaffinity(0, {cpus.get()})
+
+
+def run_benchmark(sizes: Iterable[Tuple[int, int]],
+                  solvers: Iterable[str] = (DEFAULT_SOLVER,),
+                  families: Iterable[str] = ("uniform",),
+                  seed: int = 0,
+                  repeats: int = 5,
+                  warmup: int = 1,
+                  verbose: bool = True,
+                  workers: Optional[int] = 1,
+                  pin_cpus: bool = False,
+                  input_directory: Optional[str] = None) -> List[dict]:
+    '''
+    Method benchmarks solvers on seeded instances. Every instance is generated into an
+    input file once (and reused by later benchmarks if input_directory is given), then
+    each solver is run warmup times without measuring and repeats times with measuring
+    of all phases. Instances are spread across worker processes.
+
+    Parameters:
+    ----------
+    sizes : Iterable[Tuple[int, int]]
+        (number of wells, number of houses per well) of benchmarked instances
+    solvers : Iterable[str], optional
+        names of benchmarked solver backends, by default DEFAULT_SOLVER only
+    families : Iterable[str], optional
+        names of instance families (see src.benchmark.families), by default "uniform"
+    seed : int, optional
+        seed of the instances, by default 0
+    repeats : int, optional
+        number of measured runs, by default 5
+    warmup : int, optional
+        number of runs before measuring, by default 1
+    verbose : bool, optional
+        whether progress should be printed, by default True
+    workers : int, optional
+        number of worker processes, by default 1 (instances are benchmarked in this
+        process), None for number of processors. More than one worker requires pin_cpus,
+        as unpinned concurrent measurements disturb each other
+    pin_cpus : bool, optional
+        whether every worker process should be pinned to its own processor, by default
+        False, workers are limited to the number of available processors then
+    input_directory : str, optional
+        directory in which generated input files are cached, by default a temporary
+        directory removed after benchmarking
+
+    Returns:
+    -------
+    List of records, one per (family, n, k, solver), with summary of every phase.
+    '''
+    solvers = list(solvers)
+    cases = [(family, n, k) for family in families for n, k in sizes]
+
+    if workers != 1 and not pin_cpus:
+        raise ValueError(f"Benchmarking with {workers or 'all'} workers requires pinning them to processors (pin_cpus).")
+    if pin_cpus and not hasattr(os, "sched_setaffinity"):
+        print('[WARN] Pinning of processes is not supported on this platform, workers are not pinned.')
+        pin_cpus = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        if input_directory is None:
+            input_directory = directory
+        os.makedirs(input_directory, exist_ok=True)
+        arguments = [(family, n, k, seed, solvers, repeats, warmup, input_directory, verbose) for family, n, k in cases]
+
+        if workers == 1 and not pin_cpus:
+            results = [benchmark_instance(*argument) for argument in arguments]
+        else:
+            initializer, initargs = None, ()
+            if pin_cpus:
+                available = sorted(os.sched_getaffinity(0))
+                workers = min(workers or len(available), len(available))
+                cpus = multiprocessing.Queue()
+                for cpu in available[:workers]:
+                    cpus.put(cpu)
+                initializer, initargs = pin_worker, (cpus,)
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+                results = list(executor.map(benchmark_instance, *zip(*arguments))) if arguments else []
+
+    return [record for records in results for record in records]
@@ -1,6 +1,11 @@
 import argparse
 from enum import Enum, auto
 
+from src.benchmark.families import available_families
+from src.helpers.result_cache import RESULT_CACHE_BYTES
+from src.models.constants import HEURISTIC_TIME_BUDGET, PARTITION_CELL_WELLS, PARTITION_SOLVER
+from src.solvers.registry import DEFAULT_SOLVER, available_solvers
+
 class ApplicationMode(str, Enum):
     '''
     An enum defining possible types in which algorithm can be run.
@@ -10,12 +15,22 @@ class ApplicationMode(str, Enum):
     GENERATE_INPUT - generate input graph and store it into a file
     GENERATE_AND_RUN - generate input graph, store it into a file and run the algorithm
     READ_INPUT - read input from the file
-    BENCHMARK - run algorithm benchmarking
+    BENCHMARK - run algorithm benchmarking on seeded instances and store the results
+    BENCHMARK_COMPARE - compare benchmark results with the baseline results and report regressions
+    CONVERT_INPUT - convert input file between text and binary (.bin) format
+    SOLVE_MANY - solve all input files of the directory in a pool of processes
+    APPROXIMATE - read input from the file and solve it approximately in spatial cells, reporting the optimality gap
+    HEURISTIC - read input from the file and solve it with greedy assignment improved by local search within time budget
     '''
     GENERATE_INPUT = "GENERATE_INPUT"
     GENERATE_AND_RUN = "GENERATE_AND_RUN"
     READ_INPUT = "READ_INPUT"
     BENCHMARK = "BENCHMARK"
+    BENCHMARK_COMPARE = "BENCHMARK_COMPARE"
+    CONVERT_INPUT = "CONVERT_INPUT"
+    SOLVE_MANY = "SOLVE_MANY"
+    APPROXIMATE = "APPROXIMATE"
+    HEURISTIC = "HEURISTIC"
 
     @staticmethod
     def from_str(label):
@@ -24,6 +39,11 @@ class ApplicationMode(str, Enum):
             ApplicationMode.GENERATE_AND_RUN.value: ApplicationMode.GENERATE_AND_RUN,
             ApplicationMode.READ_INPUT.value: ApplicationMode.READ_INPUT,
             ApplicationMode.BENCHMARK.value: ApplicationMode.BENCHMARK,
+            ApplicationMode.BENCHMARK_COMPARE.value: ApplicationMode.BENCHMARK_COMPARE,
+            ApplicationMode.CONVERT_INPUT.value: ApplicationMode.CONVERT_INPUT,
+            ApplicationMode.SOLVE_MANY.value: ApplicationMode.SOLVE_MANY,
+            ApplicationMode.APPROXIMATE.value: ApplicationMode.APPROXIMATE,
+            ApplicationMode.HEURISTIC.value: ApplicationMode.HEURISTIC,
         }
         if label in label_map:
             return label_map[label]
@@ -40,5 +60,25 @@ def parse_arguments():
     parser.add_argument("-k", default=3, type=int)
     parser.add_argument("-i", "--input_file", default="input.txt", type=str)
     parser.add_argument("-o", "--output_file", default="output.txt", type=str)
+    parser.add_argument("-s", "--solver", default=DEFAULT_SOLVER, choices=available_solvers(), type=str)
+    parser.add_argument("-w", "--workers", default=None, type=int)
+    parser.add_argument("-d", "--output_directory", default=None, type=str)
+    parser.add_argument("--statistics", action="store_true")
+    parser.add_argument("-f", "--family", default="uniform", choices=available_families(), type=str)
+    parser.add_argument("--seed", default=None, type=int)
+    parser.add_argument("--repeats", default=5, type=int)
+    parser.add_argument("--warmup", default=1, type=int)
+    parser.add_argument("-b", "--benchmark_file", default="benchmark.json", type=str)
+    parser.add_argument("--baseline_file", default="benchmark_baseline.json", type=str)
+    parser.add_argument("--threshold", default=0.1, type=float)
+    parser.add_argument("--pin_cpus", action="store_true")
+    parser.add_argument("--input_directory", default=None, type=str)
+    parser.add_argument("--cache_directory", default=None, type=str)
+    parser.add_argument("--cache_bytes", default=RESULT_CACHE_BYTES, type=int)
+    parser.add_argument("--cell_wells", default=PARTITION_CELL_WELLS, type=int)
+    parser.add_argument("--cell_solver", default=PARTITION_SOLVER, choices=available_solvers(), type=str)
+    parser.add_argument("--time_budget", default=HEURISTIC_TIME_BUDGET, type=float)
+    parser.add_argument("--no-render", dest="no_render", action="store_true")
+    parser.add_argument("--save-plot", dest="save_plot", default=None, type=str)
 
     return parser.parse_args()
\ No newline at end of file
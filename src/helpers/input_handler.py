@@ -1,13 +1,31 @@
 
 import numpy as np
-from typing import Tuple
+from itertools import chain
+from typing import Iterable, Optional, Tuple
 
 from src.models.graph import Graph
 from src.models.graph import InitialGraph
+from src.models.graph import rounding_ambiguous
 
-def generate_input(N: int, K: int, input_file: str) -> None:
+BINARY_INPUT_MAGIC = b"HWELLS01"
+BINARY_INPUT_VERSION = 1
+BINARY_INPUT_EXTENSION = ".bin"
+BINARY_COORDINATE_TYPE = np.dtype('<f8')
+# Maximal number of points generated, formatted or written at once
+INPUT_CHUNK_POINTS = 1 << 16
+BINARY_INPUT_HEADER = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('reserved', '<u4'),
+    ('n', '<i8'),
+    ('k', '<i8'),
+])
+
+def generate_input(N: int, K: int, input_file: str, family: str = "uniform", seed: Optional[int] = None) -> None:
     '''
-    Method generates sample input for N wells and K*N houses.
+    Method generates sample input for N wells and K*N houses. Houses are generated and
+    written in chunks, so that large instances never reside in memory. Input is stored in
+    the binary format if name of the file ends with BINARY_INPUT_EXTENSION.
 
     Parameters:
     ----------
@@ -17,24 +35,71 @@ def generate_input(N: int, K: int, input_file: str) -> None:
         number of houses
     input_file : str
         name of the input file in which input is to be stored
+    family : str, optional
+        name of the instance family (see src.benchmark.families), by default "uniform"
+    seed : int, optional
+        seed of the instance, by default None (random instance)
     '''
-    x_well = np.random.rand(N) * 10
-    y_well = np.random.rand(N) * 10
+    # families use round_coordinates of this module
+    from src.benchmark.families import generate_chunks
 
-    x_house = np.random.rand(K*N) * 10
-    y_house = np.random.rand(K*N) * 10
+    wells_coordinates, houses_chunks = generate_chunks(family, N, K, seed)
+    write_input_chunks(N, K, chain([wells_coordinates], houses_chunks), input_file, input_file.endswith(BINARY_INPUT_EXTENSION))
 
-    with open(input_file, "w") as file:
-        file.write(f"{N} {K}\n")
-        for i in range(N):
-            file.write(f"{round(x_well[i], 2)},{round(y_well[i], 2)}\n")
-        for i in range(K*N):
-            file.write(f"{round(x_house[i], 2)},{round(y_house[i], 2)}\n")
 
+def round_coordinates(values: np.ndarray) -> np.ndarray:
+    '''
+    Vectorized counterpart of round(value, 2). Values lying (numerically) on a rounding
+    boundary may round differently than in python's correctly rounded round(), so they
+    are rounded with round() itself.
 
-def read_input(input_file) -> InitialGraph:
+    Parameters:
+    ----------
+    values : np.ndarray
+        values to be rounded
+
+    Returns:
+    -------
+    Array of rounded values, identical to the ones given by round(value, 2).
+    '''
+    scaled = values * 100
+    ambiguous = rounding_ambiguous(scaled)
+
+    result = np.rint(scaled) / 100
+    result[ambiguous] = [round(value, 2) for value in values[ambiguous].tolist()]
+    return result
+
+
+def is_binary_input(input_file: str) -> bool:
+    '''
+    Method checks if given input file is stored in the binary format.
+    '''
+    with open(input_file, "rb") as file:
+        return file.read(len(BINARY_INPUT_MAGIC)) == BINARY_INPUT_MAGIC
+
+
+def read_input_size(input_file: str) -> Tuple[int, int]:
     '''
-    Method reads input file and returns graph data
+    Method reads only the header of input file (in any format).
+
+    Returns:
+    -------
+    Tuple (number of wells, number of houses per well).
+    '''
+    if is_binary_input(input_file):
+        header = np.fromfile(input_file, dtype=BINARY_INPUT_HEADER, count=1)[0]
+        return int(header['n']), int(header['k'])
+
+    with open(input_file, "r") as file:
+        n, k = file.readline().split(' ')
+        return int(n), int(k)
+
+
+def read_text_input(input_file: str) -> InitialGraph:
+    '''
+    Method reads input file in the text format - first line with the number of wells
+    and houses per well, followed by "x,y" lines of wells and then houses. Coordinates
+    are parsed in bulk and rounded to 2 decimal places.
 
     Parameters:
     ----------
@@ -53,15 +118,123 @@ def read_input(input_file) -> InitialGraph:
         n = int(sizes[0])
         k = int(sizes[1])
 
-        wells_coordinates = np.empty((n, 2))
-        houses_coordinates = np.empty((n*k, 2))
+        coordinates = np.loadtxt(file, delimiter=",", ndmin=2, max_rows=n + n * k)
+
+    if coordinates.shape != (n + n * k, 2):
+        raise ValueError(f"Expected {n + n * k} lines with coordinates, found {len(coordinates)}.")
+
+    coordinates = round_coordinates(coordinates)
+    return InitialGraph(n, k, coordinates[:n], coordinates[n:])
+
+
+def read_binary_input(input_file: str) -> InitialGraph:
+    '''
+    Method reads input file in the binary format. Coordinates are memory-mapped, so they
+    are not parsed, and rounded to 2 decimal places as in the text format, so that both
+    formats of an instance give the same costs.
+
+    Parameters:
+    ----------
+    input_file : str
+        name of the input file from which data is to be read
+    '''
+    header = np.fromfile(input_file, dtype=BINARY_INPUT_HEADER, count=1)[0]
+    if header['magic'] != BINARY_INPUT_MAGIC or header['version'] != BINARY_INPUT_VERSION:
+        raise ValueError(f"{input_file} is not a binary input file of version {BINARY_INPUT_VERSION}.")
+
+    n, k = int(header['n']), int(header['k'])
+    offset = BINARY_INPUT_HEADER.itemsize
+
+    wells_coordinates = np.memmap(input_file, dtype=BINARY_COORDINATE_TYPE, mode='r', offset=offset, shape=(n, 2))
+    offset += wells_coordinates.nbytes
+    houses_coordinates = np.memmap(input_file, dtype=BINARY_COORDINATE_TYPE, mode='r', offset=offset, shape=(n * k, 2))
+
+    return InitialGraph(n, k, round_coordinates(np.asarray(wells_coordinates)), round_coordinates(np.asarray(houses_coordinates)))
 
-        for i, line in enumerate(file):
-            coordinates_str = line.split(",")
-            x, y = round(float(coordinates_str[0]), 2), round(float(coordinates_str[1]), 2)
-            if i < n:
-                wells_coordinates[i, :] = x, y 
-            else:
-                houses_coordinates[i - n, :] = x, y  
 
-        return InitialGraph(n, k, wells_coordinates, houses_coordinates)
+def read_input(input_file) -> InitialGraph:
+    '''
+    Method reads input file and returns graph data. Both text and binary formats are
+    supported, the format is recognized by the header of the file.
+
+    Parameters:
+    ----------
+    input_file : str
+        name of the input file from which data is to be read
+    '''
+    if is_binary_input(input_file):
+        return read_binary_input(input_file)
+    return read_text_input(input_file)
+
+
+def write_input_chunks(n: int, k: int, chunks: Iterable[np.ndarray], input_file: str, binary: bool = False) -> None:
+    '''
+    Method stores coordinates given in chunks (wells first, then houses) into input file,
+    every chunk is formatted and written at once.
+
+    Parameters:
+    ----------
+    n : int
+        number of wells
+    k : int
+        number of houses per well
+    chunks : Iterable[np.ndarray]
+        arrays of shape (_, 2) with n + n * k coordinates in total
+    input_file : str
+        name of the input file
+    binary : bool, optional
+        whether input should be stored in the binary format, by default False
+    '''
+    if not binary:
+        with open(input_file, "w") as file:
+            file.write(f"{n} {k}\n")
+            for chunk in chunks:
+                for start in range(0, len(chunk), INPUT_CHUNK_POINTS):
+                    rows = np.asarray(chunk[start:start + INPUT_CHUNK_POINTS]).tolist()
+                    file.write("".join(f"{x},{y}\n" for x, y in rows))
+        return
+
+    header = np.zeros(1, dtype=BINARY_INPUT_HEADER)
+    header['magic'] = BINARY_INPUT_MAGIC
+    header['version'] = BINARY_INPUT_VERSION
+    header['n'] = n
+    header['k'] = k
+
+    with open(input_file, "wb") as file:
+        header.tofile(file)
+        for chunk in chunks:
+            np.ascontiguousarray(chunk, dtype=BINARY_COORDINATE_TYPE).tofile(file)
+
+
+def write_text_input(graph: InitialGraph, input_file: str) -> None:
+    '''
+    Method stores graph into input file in the text format.
+    '''
+    write_input_chunks(graph.n, graph.k, (graph.wells_coordinates, graph.houses_coordinates), input_file)
+
+
+def write_binary_input(graph: InitialGraph, input_file: str) -> None:
+    '''
+    Method stores graph into input file in the binary format - a fixed size header
+    followed by little-endian float64 coordinates of wells and houses.
+    '''
+    write_input_chunks(graph.n, graph.k, (graph.wells_coordinates, graph.houses_coordinates), input_file, binary=True)
+
+
+def convert_input(input_file: str, output_file: str) -> None:
+    '''
+    Method converts input file between the text and binary format. Output is stored in
+    the binary format if its name ends with BINARY_INPUT_EXTENSION, in text format otherwise.
+
+    Parameters:
+    ----------
+    input_file : str
+        name of the input file (in any format)
+    output_file : str
+        name of the converted file
+    '''
+    graph = read_input(input_file)
+    if output_file.endswith(BINARY_INPUT_EXTENSION):
+        write_binary_input(graph, output_file)
+    else:
+        write_text_input(graph, output_file)
@@ -1,10 +1,98 @@
+import re
+import numpy as np
+from itertools import islice
+from typing import Tuple
+
 from src.models.matching import Matching
 from src.models.graph import InitialGraph
 
+NPZ_OUTPUT_EXTENSION = ".npz"
+CSV_OUTPUT_EXTENSION = ".csv"
+# Columns of the columnar outputs, wells and houses are numbered from 1 as in the text output
+OUTPUT_COLUMNS = ("well", "house", "distance", "well_x", "well_y", "house_x", "house_y")
+# Number of wells formatted before a single write of the text output
+OUTPUT_CHUNK_WELLS = 4096
+# Single well or house of the text output, e.g. "W1(0.5,2.25)"
+OUTPUT_NODE_PATTERN = re.compile(r'([WH])(\d+)\(([^,()]+),([^,()]+)\)')
+
+
+def assignment_columns(graph: InitialGraph, matching: Matching) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Returns (well, house, precise distance) of every assigned pair, ordered by wells.
+    Wells and houses are indexed from 0.
+    '''
+    wells = np.arange(matching.n) // max(graph.k, 1)
+    houses = np.asarray(matching.matching_house, dtype=np.int64)
+    distances = InitialGraph.precise_pair_distances(
+        np.asarray(graph.wells_coordinates)[wells], np.asarray(graph.houses_coordinates)[houses]
+    )
+    return wells, houses, distances
+
+
+def write_text_output(graph: InitialGraph, matching: Matching, output_file: str) -> None:
+    '''
+    Method writes results of matching to indicated output file in the text format. Lines
+    are formatted in chunks of wells, each chunk is written at once.
+    '''
+    try:
+        output = open(output_file, 'w')
+    except IOError:
+        raise FileNotFoundError(f"Error: Unable to open output file {output_file}")
+
+    _, houses, distances = assignment_columns(graph, matching)
+    # summed in the order of the pairs, so that the total equals the sum of python floats
+    total_cost = float(np.cumsum(distances)[-1]) if len(distances) > 0 else 0
+
+    house_names = [f"H{house + 1}({x},{y})" for house, (x, y) in enumerate(np.asarray(graph.houses_coordinates).tolist())]
+    assigned_names = [house_names[house] for house in houses.tolist()]
+    wells_coordinates = np.asarray(graph.wells_coordinates).tolist()
+
+    with output:
+        for start in range(0, graph.n, OUTPUT_CHUNK_WELLS):
+            end = min(start + OUTPUT_CHUNK_WELLS, graph.n)
+            output.write("".join(
+                f"W{well + 1}({well_x},{well_y}) -> " + ",".join(assigned_names[well * graph.k:(well + 1) * graph.k]) + "\n"
+                for well, (well_x, well_y) in enumerate(wells_coordinates[start:end], start)
+            ))
+
+        output.write(f"Total Cost: {total_cost}\n")
+
+
+def write_columnar_output(graph: InitialGraph, matching: Matching, output_file: str) -> None:
+    '''
+    Method writes results of matching as columns OUTPUT_COLUMNS, one row per assigned
+    (well, house) pair. Output is stored as numpy arrays if its name ends with
+    NPZ_OUTPUT_EXTENSION and as CSV file otherwise.
+    '''
+    wells, houses, distances = assignment_columns(graph, matching)
+    wells_coordinates = np.asarray(graph.wells_coordinates)[wells]
+    houses_coordinates = np.asarray(graph.houses_coordinates)[houses]
+    columns = (
+        wells + 1, houses + 1, distances,
+        wells_coordinates[:, 0], wells_coordinates[:, 1], houses_coordinates[:, 0], houses_coordinates[:, 1],
+    )
+
+    if output_file.endswith(NPZ_OUTPUT_EXTENSION):
+        np.savez(output_file, **dict(zip(OUTPUT_COLUMNS, columns)))
+        return
+
+    # coordinates are written as shortest representations, same as in the text output
+    rows = zip(*(column.tolist() for column in columns))
+    with open(output_file, "w") as output:
+        output.write(",".join(OUTPUT_COLUMNS) + "\n")
+        while True:
+            chunk = [f"{well},{house},{distance:.6f},{well_x},{well_y},{house_x},{house_y}\n"
+                     for well, house, distance, well_x, well_y, house_x, house_y in islice(rows, OUTPUT_CHUNK_WELLS * max(graph.k, 1))]
+            if not chunk:
+                break
+            output.write("".join(chunk))
+
 
 def write_to_output(graph: InitialGraph, matching: Matching, output_file: str):
     '''
-    Method writes results of matching to indicated output file.
+    Method writes results of matching to indicated output file. Files ending with
+    NPZ_OUTPUT_EXTENSION or CSV_OUTPUT_EXTENSION get columnar output, other files the
+    text format.
 
     Parameters:
     ----------
@@ -13,32 +101,71 @@ def write_to_output(graph: InitialGraph, matching: Matching, output_file: str):
     output_file : str
         name of the file to which the results are to be stores
     '''
-    try:
-        output = open(output_file, 'w')
-    except IOError:
-        raise FileNotFoundError(f"Error: Unable to open output file {output_file}")
+    if output_file.endswith((NPZ_OUTPUT_EXTENSION, CSV_OUTPUT_EXTENSION)):
+        write_columnar_output(graph, matching, output_file)
+    else:
+        write_text_output(graph, matching, output_file)
 
-    total_cost = 0
-    for well in range(graph.n):
-        well_x, well_y = graph.wells_coordinates[well]
 
-        well_duplicate_start = well * graph.k
-        well_duplicate_end = well_duplicate_start + graph.k
+def read_output(output_file: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    '''
+    Method reads output file in any format written by write_to_output.
 
-        output.write(f"W{well + 1}({well_x},{well_y}) -> ")
+    Parameters:
+    ----------
+    output_file : str
+        name of the output file
+
+    Returns:
+    -------
+    Tuple (coordinates of wells, coordinates of houses, well of every house, total cost).
+    Wells and houses are indexed from 0, houses not present in the output are assigned
+    to well -1.
+    '''
+    if output_file.endswith(NPZ_OUTPUT_EXTENSION):
+        with np.load(output_file) as data:
+            columns = {name: data[name] for name in OUTPUT_COLUMNS}
+    elif output_file.endswith(CSV_OUTPUT_EXTENSION):
+        table = np.loadtxt(output_file, delimiter=',', skiprows=1, ndmin=2).reshape(-1, len(OUTPUT_COLUMNS))
+        columns = dict(zip(OUTPUT_COLUMNS, table.T))
+    else:
+        columns = read_text_output_columns(output_file)
 
-        for well_duplicate in range(well_duplicate_start, well_duplicate_end):
-            house =  matching.matching_house[well_duplicate]
-            house_x, house_y = graph.houses_coordinates[house]
-            output.write(f"H{house + 1}({house_x},{house_y})")
+    wells = columns["well"].astype(np.int64) - 1
+    houses = columns["house"].astype(np.int64) - 1
 
-            total_cost += InitialGraph.precise_distance(well_x, well_y, house_x, house_y)
+    wells_coordinates = np.zeros((wells.max() + 1 if len(wells) > 0 else 0, 2))
+    wells_coordinates[wells] = np.column_stack([columns["well_x"], columns["well_y"]])
+    houses_coordinates = np.zeros((houses.max() + 1 if len(houses) > 0 else 0, 2))
+    houses_coordinates[houses] = np.column_stack([columns["house_x"], columns["house_y"]])
 
-            if well_duplicate < well_duplicate_end - 1:
-                output.write(",")
+    well_of_house = np.full(len(houses_coordinates), -1, dtype=np.int64)
+    well_of_house[houses] = wells
 
-        output.write("\n")
+    if "total_cost" in columns:
+        total_cost = columns["total_cost"]
+    else:
+        total_cost = float(np.cumsum(columns["distance"])[-1]) if len(wells) > 0 else 0.0
+    return wells_coordinates, houses_coordinates, well_of_house, total_cost
+
+
+def read_text_output_columns(output_file: str) -> dict:
+    '''
+    Method parses output file in the text format into columns of OUTPUT_COLUMNS (without
+    distances, which are not stored) and its "total_cost".
+    '''
+    with open(output_file, "r") as file:
+        lines = file.readlines()
 
-    output.write(f"Total Cost: {total_cost}\n")
+    pairs = []
+    for line in lines[:-1]:
+        nodes = OUTPUT_NODE_PATTERN.findall(line)
+        pairs.extend((nodes[0], house) for house in nodes[1:])
 
-    output.close()
+    wells = np.array([well[1:] for well, _ in pairs], dtype=float).reshape(-1, 3)
+    houses = np.array([house[1:] for _, house in pairs], dtype=float).reshape(-1, 3)
+    return {
+        "well": wells[:, 0], "well_x": wells[:, 1], "well_y": wells[:, 2],
+        "house": houses[:, 0], "house_x": houses[:, 1], "house_y": houses[:, 2],
+        "total_cost": float(lines[-1].split(":")[1]) if lines else 0.0,
+    }
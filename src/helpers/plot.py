@@ -1,14 +1,27 @@
-import re
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.ticker as mticker
 
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
 from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 
 from src.models.graph import InitialGraph
+from src.helpers.input_handler import read_input
+from src.helpers.output_handler import assignment_columns, read_output
+from src.models.matching import Matching
+
+# Above this number of wells and houses their names and distances are not drawn
+PLOT_LABELS_LIMIT = 100
+# Above this number of (well, house) pairs the edges between all of them are not drawn
+PLOT_ALL_PAIRS_LIMIT = 2500
+# Above this number of assigned pairs only evenly spaced part of them is drawn
+PLOT_SEGMENTS_LIMIT = 100000
 
 def exponential_cmap(base_cmap=None, colors_count = 256):
-    base = plt.cm.get_cmap(base_cmap)
+    base = matplotlib.colormaps.get_cmap(base_cmap)
     color_list = base(np.linspace(0, 1, colors_count))
 
     # Normalize the RGB values to be in the [0, 1] range
@@ -22,7 +35,21 @@ def exponential_cmap(base_cmap=None, colors_count = 256):
 def log_tick_formatter(val, pos=None):
     return f"$10^{{{int(val)}}}$"
 
-def create_time_complexity_plot(n, k, measurements_grid, logarithmic = False, smoothed = False):
+def create_figure(figsize, headless = False) -> Figure:
+    '''
+    Method creates figure managed by pyplot, or a figure rendered by Agg (which needs no
+    display and is not shown by plt.show) if headless.
+    '''
+    if headless:
+        figure = Figure(figsize=figsize)
+        FigureCanvasAgg(figure)
+        return figure
+
+    # pyplot (and the interactive backend) is loaded only when figures are displayed
+    import matplotlib.pyplot as plt
+    return plt.figure(figsize=figsize)
+
+def create_time_complexity_plot(n, k, measurements_grid, logarithmic = False, smoothed = False, headless = False):
     if smoothed:
         try:
             from scipy.signal import convolve2d
@@ -44,7 +71,8 @@ def create_time_complexity_plot(n, k, measurements_grid, logarithmic = False, sm
 
     T = A * T + B
 
-    fig, axs = plt.subplots(1, 3, figsize=(18, 6), subplot_kw={"projection": "3d"})
+    fig = create_figure((18, 6), headless)
+    axs = [fig.add_subplot(1, 3, i + 1, projection="3d") for i in range(3)]
 
     axs[0].set_xlabel('N')
     axs[0].set_ylabel('K')
@@ -58,8 +86,8 @@ def create_time_complexity_plot(n, k, measurements_grid, logarithmic = False, sm
     axs[2].set_ylabel('K')
     axs[2].set_zlabel('Time')
 
-    limit_proxy = plt.Line2D([0], [0], linestyle="none", c='red', marker='o', markersize=10, markerfacecolor='red', alpha=0.7)
-    measurements_proxy = plt.Line2D([0], [0], linestyle="none", c='green', marker='o', markersize=10, markerfacecolor='green', alpha=0.7)
+    limit_proxy = Line2D([0], [0], linestyle="none", c='red', marker='o', markersize=10, markerfacecolor='red', alpha=0.7)
+    measurements_proxy = Line2D([0], [0], linestyle="none", c='green', marker='o', markersize=10, markerfacecolor='green', alpha=0.7)
     axs[2].legend([limit_proxy, measurements_proxy], [f'O((nk)^3)', f'Measurements'])
 
     axs[0].set_title(f'O((nk)^3)')
@@ -112,132 +140,150 @@ def create_time_complexity_plot(n, k, measurements_grid, logarithmic = False, sm
         # axs[2].zaxis.set_major_formatter(mticker.FuncFormatter(log_tick_formatter))
         # axs[2].zaxis.set_major_locator(mticker.MaxNLocator(integer=True))
 
-def create_input_plot(input_file):
-
-    wells = {}
-    houses = {}
-    
-    with open(input_file, "r") as file:
-        input = file.readlines()
-        n, k = input[0].split()
-        n, k = int(n), int(k)
-
-        for i,line in enumerate(input[1:n+1]):
-            well_x, well_y = line.split(',')
-            wells[f"W{i+1}"] = (float(well_x), float(well_y[:-1]))
-
-        for i, line in enumerate(input[n+1:n+k*n + 1]):
-            house_x, house_y = line.split(',')
-            houses[f"H{i+1}"] = (float(house_x), float(house_y))
-
-    # Plotting
-    fig, axis = plt.subplots(figsize=(12, 6))
+    return fig
+
+def draw_points(axis, wells_coordinates, houses_coordinates):
+    '''
+    Method draws wells and houses with a single scatter call each, names are drawn only
+    for up to PLOT_LABELS_LIMIT points. Markers shrink when there are more points.
+    '''
+    points = len(wells_coordinates) + len(houses_coordinates)
+    size = 36 * min(1, np.sqrt(PLOT_LABELS_LIMIT / max(points, 1)))
+    axis.scatter(houses_coordinates[:, 0], houses_coordinates[:, 1], s=size, color='red', zorder=3)
+    axis.scatter(wells_coordinates[:, 0], wells_coordinates[:, 1], s=size, color='blue', zorder=4)
+
+    if points <= PLOT_LABELS_LIMIT:
+        for prefix, coordinates in (("W", wells_coordinates), ("H", houses_coordinates)):
+            for i, (x, y) in enumerate(coordinates.tolist()):
+                axis.text(x, y, f"{prefix}{i+1}", ha='right', va='bottom')
+
+def draw_segments(axis, wells_coordinates, houses_coordinates, linestyle, color):
+    '''
+    Method draws segments between paired wells and houses as a single LineCollection,
+    distances are drawn only for up to PLOT_LABELS_LIMIT segments.
+    '''
+    segments = np.stack([wells_coordinates, houses_coordinates], axis=1)
+    axis.add_collection(LineCollection(segments, linestyles=linestyle, colors=color, linewidths=1))
+
+    if len(segments) <= PLOT_LABELS_LIMIT:
+        distances = InitialGraph.precise_pair_distances(wells_coordinates, houses_coordinates)
+        centers = (wells_coordinates + houses_coordinates) / 2
+        for (x, y), distance in zip(centers.tolist(), distances.tolist()):
+            axis.text(x, y, f'{distance:.6f}', ha='center', va='center')
+
+def draw_all_pairs(axis, wells_coordinates, houses_coordinates):
+    '''
+    Method draws edges between every well and house, if there are at most PLOT_ALL_PAIRS_LIMIT of them.
+    '''
+    if len(wells_coordinates) * len(houses_coordinates) > PLOT_ALL_PAIRS_LIMIT:
+        return
+
+    wells = np.repeat(wells_coordinates, len(houses_coordinates), axis=0)
+    houses = np.tile(houses_coordinates, (len(wells_coordinates), 1))
+    draw_segments(axis, wells, houses, '--', 'black')
+
+def draw_assignment(axis, wells_coordinates, houses_coordinates, well_of_house):
+    '''
+    Method draws edges between houses and their wells, above PLOT_SEGMENTS_LIMIT assigned
+    houses only every n-th of them is drawn.
+    '''
+    houses = np.flatnonzero(well_of_house >= 0)
+    step = -(-len(houses) // PLOT_SEGMENTS_LIMIT)
+    houses = houses[::max(step, 1)]
+    draw_segments(axis, wells_coordinates[well_of_house[houses]], houses_coordinates[houses], '-', 'red')
+
+def create_instance_plot(wells_coordinates, houses_coordinates, headless = False) -> Figure:
+    wells_coordinates = np.asarray(wells_coordinates, dtype=float).reshape(-1, 2)
+    houses_coordinates = np.asarray(houses_coordinates, dtype=float).reshape(-1, 2)
+
+    fig = create_figure((12, 6), headless)
     fig.suptitle("Input Visualization")
+    axis = fig.add_subplot(1, 1, 1)
 
-    # Left subplot
     axis.set_title("Input")
     axis.set_xlabel("X")
     axis.set_ylabel("Y")
+    draw_all_pairs(axis, wells_coordinates, houses_coordinates)
+    draw_points(axis, wells_coordinates, houses_coordinates)
+
+    fig.tight_layout()
+    return fig
+
+def create_input_plot(input_file, headless = False) -> Figure:
+    graph = read_input(input_file)
+    return create_instance_plot(graph.wells_coordinates, graph.houses_coordinates, headless)
+
+def create_solution_plot(wells_coordinates, houses_coordinates, well_of_house, total_cost, headless = False) -> Figure:
+    '''
+    Method plots the input (with edges between all wells and houses) and the assignment
+    from arrays held in memory.
+
+    Parameters:
+    ----------
+    wells_coordinates : np.ndarray
+        array of shape (n, 2) with coordinates of wells
+    houses_coordinates : np.ndarray
+        array of shape (n * k, 2) with coordinates of houses
+    well_of_house : np.ndarray
+        well assigned to every house (-1 if the house is not assigned)
+    total_cost : float
+        total cost shown in the title
+    headless : bool, optional
+        whether the figure should be rendered by Agg instead of pyplot, by default False
+    '''
+    wells_coordinates = np.asarray(wells_coordinates, dtype=float).reshape(-1, 2)
+    houses_coordinates = np.asarray(houses_coordinates, dtype=float).reshape(-1, 2)
+    well_of_house = np.asarray(well_of_house, dtype=np.int64)
+
+    fig = create_figure((12, 6), headless)
+    fig.suptitle(f"Total Cost: {total_cost}")
+    axs = [fig.add_subplot(1, 2, i + 1) for i in range(2)]
 
-    for well_name, (well_x, well_y) in wells.items():
-        axis.scatter(well_x, well_y, color='blue', s = 100)
-        axis.text(well_x, well_y, well_name, ha='right', va='bottom')
-
-    for house_name, (house_x, house_y) in houses.items():
-        axis.scatter(house_x, house_y, color='red', s = 100)
-        axis.text(house_x, house_y, house_name, ha='right', va='bottom')
-
-        # Connect each house to every well with a line and label the distance
-        for _, (well_x, well_y) in wells.items():
-            distance = InitialGraph.precise_distance(well_x, well_y, house_x, house_y)
-            axis.plot([house_x, well_x], [house_y, well_y], linestyle='--', color='black')
-            axis.text((house_x + well_x) / 2, (house_y + well_y) / 2, f'{distance:.6f}', ha='center', va='center')
-
-    plt.tight_layout()
-
-def create_output_plot(n, k, output_file):
-    pattern_string = r'(\w+)\(([\d.]+),([\d.]+)\) -> ' + ','.join([r'(\w+)\(([\d.]+),([\d.]+)\)'] * k)
-    pattern = re.compile(pattern_string)
-
-    wells = {}
-    houses = {}
-    house_well_map = []
-    
-    with open(output_file, "r") as file:
-        output = file.readlines()
-
-        total_cost = output[len(output)-1]
-        for line in output[:len(output)-1]:
-            for mapping in pattern.findall(line):
-                well_name, well_x, well_y, *houses_values = mapping
-                wells[well_name] = (float(well_x), float(well_y))
-
-                for i in range(len(houses_values)//3):
-                    house_name, house_x, house_y = houses_values[3*i:3*i+3]
-                    houses[house_name] = (float(house_x), float(house_y))
-                    house_well_map.append([house_name, well_name])
-
-    # Plotting
-    fig, axs = plt.subplots(1, 2, figsize=(12, 6))
-    fig.suptitle(total_cost)
-
-    # Left subplot
     axs[0].set_title("Input")
-    axs[0].set_xlabel("X")
-    axs[0].set_ylabel("Y")
-
-    for well_name, (well_x, well_y) in wells.items():
-        axs[0].scatter(well_x, well_y, color='blue')
-        axs[0].text(well_x, well_y, well_name, ha='right', va='bottom')
-
-    for house_name, (house_x, house_y) in houses.items():
-        axs[0].scatter(house_x, house_y, color='red')
-        axs[0].text(house_x, house_y, house_name, ha='right', va='bottom')
+    draw_all_pairs(axs[0], wells_coordinates, houses_coordinates)
 
-        # Connect each house to every well with a line and label the distance
-        for _, (well_x, well_y) in wells.items():
-            distance = InitialGraph.precise_distance(well_x, well_y, house_x, house_y)
-            axs[0].plot([house_x, well_x], [house_y, well_y], linestyle='--', color='black')
-            axs[0].text((house_x + well_x) / 2, (house_y + well_y) / 2, f'{distance:.6f}', ha='center', va='center')
-
-    # Right subplot
     axs[1].set_title("Output")
-    axs[1].set_xlabel("X")
-    axs[1].set_ylabel("Y")
+    draw_assignment(axs[1], wells_coordinates, houses_coordinates, well_of_house)
 
-    for well_name, (well_x, well_y) in wells.items():
-        axs[1].scatter(well_x, well_y, color='blue')
-        axs[1].text(well_x, well_y, well_name, ha='right', va='bottom')
+    for axis in axs:
+        axis.set_xlabel("X")
+        axis.set_ylabel("Y")
+        draw_points(axis, wells_coordinates, houses_coordinates)
 
-    for house_name, (house_x, house_y) in houses.items():
-        axs[1].scatter(house_x, house_y, color='red')
-        axs[1].text(house_x, house_y, house_name, ha='right', va='bottom')
+    fig.tight_layout()
+    return fig
 
-        # Connect each house to its corresponding well with a line and label the distance
-        for house_well_pair in house_well_map:
-            if house_well_pair[0] == house_name:
-                well_x, well_y = wells[house_well_pair[1]]
-                distance = InitialGraph.precise_distance(well_x, well_y, house_x, house_y)
-                axs[1].plot([house_x, well_x], [house_y, well_y], linestyle='-', color='red')
-                axs[1].text((house_x + well_x) / 2, (house_y + well_y) / 2, f'{distance:.6f}', ha='center', va='center')
-                break
+def create_matching_plot(graph: InitialGraph, matching: Matching, headless = False) -> Figure:
+    _, _, distances = assignment_columns(graph, matching)
+    total_cost = float(np.cumsum(distances)[-1]) if len(distances) > 0 else 0
+    well_of_house = np.asarray(matching.matching_well, dtype=np.int64) // max(graph.k, 1)
+    return create_solution_plot(graph.wells_coordinates, graph.houses_coordinates, well_of_house, total_cost, headless)
 
-    plt.tight_layout()
+def create_output_plot(n, k, output_file, headless = False) -> Figure:
+    wells_coordinates, houses_coordinates, well_of_house, total_cost = read_output(output_file)
+    return create_solution_plot(wells_coordinates, houses_coordinates, well_of_house, total_cost, headless)
 
 def display_time_complexity(n, k, measurements_grid, logarithmic = False, smoothed = False):
+    import matplotlib.pyplot as plt
     create_time_complexity_plot(n, k, measurements_grid, logarithmic, smoothed)
     plt.show()
 
 def save_time_complexity(n, k, measurements_grid, output_plot, logarithmic, smoothed = False):
-    create_time_complexity_plot(n, k, measurements_grid, logarithmic, smoothed)
-    plt.savefig(output_plot, format='png')
-    plt.close()
+    fig = create_time_complexity_plot(n, k, measurements_grid, logarithmic, smoothed, headless=True)
+    fig.savefig(output_plot, format='png')
 
 def save_output(n, k, output_file, output_plot):
-    create_output_plot(n, k, output_file)
-    plt.savefig(output_plot, format='png')
-    plt.close()
+    create_output_plot(n, k, output_file, headless=True).savefig(output_plot, format='png')
 
 def display_output(n, k, output_file):
+    import matplotlib.pyplot as plt
     create_output_plot(n, k, output_file)
     plt.show()
+
+def save_matching(graph: InitialGraph, matching: Matching, output_plot):
+    create_matching_plot(graph, matching, headless=True).savefig(output_plot, format='png')
+
+def display_matching(graph: InitialGraph, matching: Matching):
+    import matplotlib.pyplot as plt
+    create_matching_plot(graph, matching)
+    plt.show()
@@ -0,0 +1,128 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+from typing import Optional
+
+from src.models.graph import InitialGraph
+from src.models.matching import Matching
+from src.models.solution import Solution
+
+# Version of the cached results, changed whenever solvers or the format of the cache change
+RESULT_CACHE_VERSION = 1
+RESULT_CACHE_EXTENSION = ".npz"
+# Default limit of the total size of cached results (in bytes)
+RESULT_CACHE_BYTES = 1 << 30
+
+
+class ResultCache():
+    '''
+    Class represents on-disk cache of solutions, addressed by hash of the solved instance
+    and solver. Every result is a single file written atomically (under a temporary name
+    and then renamed), so the cache can be shared by concurrent processes. When the size
+    of the cache exceeds its limit, least recently used results are removed.
+
+    Attributes:
+    ----------
+    directory : str
+        directory in which results are stored
+    max_bytes : int
+        limit of the total size of the stored results
+    '''
+
+    def __init__(self, directory: str, max_bytes: int = RESULT_CACHE_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(initial_graph: InitialGraph, solver: str) -> str:
+        '''
+        Returns hash of the coordinates (as parsed, so that the text and binary input of
+        an instance share results), k, solver and RESULT_CACHE_VERSION.
+        '''
+        digest = hashlib.sha256(f"{RESULT_CACHE_VERSION} {solver} {initial_graph.n} {initial_graph.k}\n".encode())
+        for coordinates in (initial_graph.wells_coordinates, initial_graph.houses_coordinates):
+            digest.update(np.ascontiguousarray(coordinates, dtype='<f8').tobytes())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + RESULT_CACHE_EXTENSION)
+
+    def load(self, initial_graph: InitialGraph, solver: str) -> Optional[Solution]:
+        '''
+        Method returns cached solution of the instance, None if it is not cached (or its
+        file cannot be read, e.g. because it was just evicted).
+        '''
+        path = self.path(self.key(initial_graph, solver))
+        n, k = initial_graph.n, initial_graph.k
+        try:
+            with np.load(path) as data:
+                matching_house = data["matching_house"]
+                max_distance = int(data["max_distance"])
+                total_cost = int(data["total_cost"])
+                labels = (data["label_well"], data["label_house"]) if "label_well" in data else None
+            # access time is tracked by modification time, which is not disabled by mount options
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # damaged results are not returned, the instance is solved again
+        if not np.array_equal(np.sort(matching_house), np.arange(n * k)):
+            return None
+
+        M = Matching(n * k)
+        M.matching_house[:] = matching_house
+        M.matching_well[M.matching_house] = np.arange(n * k)
+        M.matched_count = n * k
+
+        solution = Solution(initial_graph, M, max_distance=max_distance)
+        if solution.total_cost != total_cost:
+            return None
+        if labels is not None:
+            solution.label_well, solution.label_house = labels
+        return solution
+
+    def store(self, solution: Solution, solver: str) -> None:
+        '''
+        Method stores the matching, dual labels (if known), total cost and maximal distance
+        of the solution, then evicts least recently used results exceeding the size limit.
+        '''
+        arrays = {
+            "matching_house": solution.matching.matching_house,
+            "max_distance": np.int64(solution.max_distance),
+            "total_cost": np.int64(solution.total_cost),
+        }
+        if solution.label_well is not None:
+            arrays["label_well"] = solution.label_well
+            arrays["label_house"] = solution.label_house
+
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as file:
+            np.savez(file, **arrays)
+        os.replace(file.name, self.path(self.key(solution.initial_graph, solver)))
+
+        self.evict()
+
+    def evict(self) -> None:
+        '''
+        Method removes least recently used results until their total size fits the limit.
+        Files removed concurrently by other processes are skipped.
+        '''
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(RESULT_CACHE_EXTENSION):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,33 +1,44 @@
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from src.helpers.input_handler import read_input
+from src.helpers.result_cache import ResultCache
 from src.models.graph import Graph, InitialGraph
 from src.models.matching import Matching
+from src.models.instance_delta import InstanceDelta
+from src.models.solution import Solution
+from src.models.solver_statistics import SolverStatistics
 from src.models.constants import *
+from src.solvers.registry import DEFAULT_SOLVER, get_solver, provides_labels, solves_initial_graph
 
 import warnings
 warnings.filterwarnings('error')
 
 
-def duplicate_wells(initial_graph: InitialGraph) -> Graph:
+def duplicate_wells(initial_graph: InitialGraph, dtype: Optional[np.dtype] = None, compute_distances: bool = True) -> Graph:
     '''
-    Method duplicates wells in the graph.
+    Method duplicates wells in the graph. Duplicates are not materialized - every one
+    of the k duplicates of a well maps to the same row of Graph.cost_table.
 
     Parameters:
     ----------
     graph : Graph
         graph with initial wells and houses nodes and edges
+    dtype : np.dtype, optional
+        integer type of costs and labels, by default chosen from the extent of coordinates
+    compute_distances : bool, optional
+        whether the cost table is filled, by default True, otherwise
+        Graph.compute_distances has to be called before solving
 
     Returns:
     -------
     Graph with duplicated wells.
     '''
     n = initial_graph.n * initial_graph.k
-    wells_coordinates = np.repeat(initial_graph.wells_coordinates, initial_graph.k, axis=0)
+    wells_coordinates = initial_graph.wells_coordinates
     houses_coordinates = initial_graph.houses_coordinates
 
-    duplicate_graph = Graph(n, wells_coordinates, houses_coordinates)
+    duplicate_graph = Graph(n, wells_coordinates, houses_coordinates, initial_graph.k, dtype, compute_distances)
 
     return duplicate_graph
 
@@ -45,6 +56,52 @@ def initial_labeling(duplicate_graph: Graph) -> Graph:
     return duplicate_graph
 
 
+def greedy_matching(duplicate_graph: Graph, M: Matching) -> Matching:
+    '''
+    Method performs column reduction - labels of houses are lowered to the smallest
+    values keeping the labeling feasible, which makes every house incident to a tight
+    edge - and greedily matches free wells along tight edges.
+
+    Parameters:
+    ----------
+    duplicate_graph : Graph
+        graph with initialized labels
+    M : Matching
+        empty matching
+
+    Returns:
+    -------
+    Matching consisting of tight edges.
+    '''
+    graph = duplicate_graph
+    rows = len(graph.cost_table)
+    if graph.cost_table.size == 0:
+        return M
+
+    # Duplicates of a well share the same row of costs and label
+    row_labels = graph.label_well[::graph.k]
+
+    # Column reduction, chunk of rows at a time
+    label_house = np.full(graph.n, np.iinfo(np.int64).min, dtype=np.int64)
+    chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // graph.n)
+    for start in range(0, rows, chunk_size):
+        chunk = graph.cost_table[start:start + chunk_size] - row_labels[start:start + chunk_size, np.newaxis].astype(np.int64)
+        np.maximum(label_house, chunk.max(axis=0), out=label_house)
+    graph.label_house[:] = label_house
+
+    # Greedy matching - every well takes free houses of its tight edges, at most one per duplicate
+    free = np.ones(graph.n, dtype=bool)
+    for row in range(rows):
+        tight = np.flatnonzero((graph.cost_table[row] == row_labels[row] + graph.label_house) & free)[:graph.k]
+        duplicates = row * graph.k + np.arange(len(tight))
+        M.matching_house[duplicates] = tight
+        M.matching_well[tight] = duplicates
+        free[tight] = False
+        M.matched_count += len(tight)
+
+    return M
+
+
 def equality_graph(duplicate_graph: Graph, root: int) -> Graph:
     '''
     Method constructs the equality graph.
@@ -93,9 +150,10 @@ def find_augmenting_path(graph: Graph, matching: Matching) -> Tuple[int, int, bo
     while graph.read < graph.write:
         well = graph.queue[graph.read]
         graph.read = graph.read + 1
+        cost_row = graph.cost_row(well)
 
         for house in range(graph.n):
-            if graph.cost_matrix[well][house] == graph.label_well[well] + graph.label_house[house] and graph.T[house] == FALSE:
+            if cost_row[house] == graph.label_well[well] + graph.label_house[house] and graph.T[house] == FALSE:
                 if matching.matching_well[house] == UNMATCHED_NODE: # Path found
                     return well, house, True 
                 graph.T[house] = TRUE
@@ -224,52 +282,183 @@ def refine_augmenting_tree_with_new_edges(graph: Graph, matching: Matching) -> T
 
 
 
-def run_hungryryan(input_file: str) -> Tuple[Graph, Matching]:
+def find_root_of_alternating_path_vectorized(graph: Graph, M: Matching) -> int:
+    '''
+    Vectorized counterpart of find_root_of_alternating_path.
     '''
-    Method runs full hungarian algorithm for given input file.
+    root = int(np.flatnonzero(M.matching_house == UNMATCHED_NODE)[0])
+
+    graph.queue[graph.write] = root
+    graph.write = graph.write + 1
+    graph.previous_well[root] = ROOT_NODE
+    graph.S[root] = TRUE
+
+    return root
+
+
+def find_augmenting_path_vectorized(graph: Graph, matching: Matching) -> Tuple[int, int, bool]:
+    '''
+    Vectorized counterpart of find_augmenting_path. Equality edges of a well are
+    detected with a single masked comparison over the whole row.
 
     Parameters:
     ----------
-    input_file : str
-        input file
+    graph : Graph
+        graph in which augmenting path is to be found
+    matching : Matching
+        current matching in a graph
 
     Returns:
     -------
-    Optimal matching.
+    Tuple (last well, last house, boolean indicating if path is augmenting).
     '''
-    ret = 0
-    # Step 0: Read and construct graph based on the input file
-    initial_graph = read_input(input_file)
+    while graph.read < graph.write:
+        well = graph.queue[graph.read]
+        graph.read = graph.read + 1
 
-    # Step 1: Duplicate wells
-    duplicate_graph = duplicate_wells(initial_graph)
+        equality_houses = np.flatnonzero(
+            (graph.cost_row(well) == graph.label_well[well] + graph.label_house) & (graph.T == FALSE)
+        )
+        if len(equality_houses) == 0:
+            continue
 
-    # Step 2: Initialize empty matching
-    M = Matching(duplicate_graph.n)
+        matched_wells = matching.matching_well[equality_houses]
+        exposed = np.flatnonzero(matched_wells == UNMATCHED_NODE)
+        if len(exposed) > 0: # Path found
+            return well, int(equality_houses[exposed[0]]), True
 
-    # Step 3: Initial feasible labeling
-    duplicate_graph = initial_labeling(duplicate_graph)
+        graph.T[equality_houses] = TRUE
+        graph.queue[graph.write:graph.write + len(matched_wells)] = matched_wells
+        graph.write = graph.write + len(matched_wells)
+        graph.add_many_to_alternating_tree(matched_wells, well)
+
+    return UNKNOWN_NODE, UNKNOWN_NODE, False
+
+
+def label_modification_vectorized(graph: Graph) -> Graph:
+    '''
+    Vectorized counterpart of label_modification.
+
+    Parameters:
+    ----------
+    graph : Graph
+        graph which labels are to be modified
+
+    Returns:
+    -------
+    Graph with modified labels.
+    '''
+    outside_tree = graph.T == FALSE
+    delta = graph.slack[outside_tree].min()
+
+    graph.label_well[graph.S == TRUE] -= delta
+    graph.label_house[~outside_tree] += delta
+    graph.slack[outside_tree] -= delta
+
+    return graph
+
+
+def refine_augmenting_tree_with_new_edges_vectorized(graph: Graph, matching: Matching) -> Tuple[int, int, bool]:
+    '''
+    Vectorized counterpart of refine_augmenting_tree_with_new_edges. Houses with zero
+    slack are located with masked search, still visited in increasing order so that
+    slack updates caused by newly added wells are taken into account.
+
+    Parameters:
+    ----------
+    graph : Graph
+        graph in which augmenting path is to be found
+    matching : Matching
+        current matching in a graph
+
+    Returns:
+    -------
+    Tuple (last well, last house, boolean indicating if path is augmenting).
+    '''
+    graph.write = 0
+    graph.read = 0
+    start = 0
+    while start < graph.n:
+        new_edges = np.flatnonzero((graph.T[start:] == FALSE) & (graph.slack[start:] == 0))
+        if len(new_edges) == 0:
+            break
+
+        house = start + int(new_edges[0])
+        start = house + 1
+        if matching.matching_well[house] == UNKNOWN_NODE:  # exposed vertex in Y found - augmenting path exists!
+            return int(graph.slack_matching_well[house]), house, True
+
+        graph.T[house] = TRUE
+        well = matching.matching_well[house]
+        if graph.S[well] == FALSE:
+            graph.queue[graph.write] = well
+            graph.write += 1
+            graph.add_to_alternating_tree(well, graph.slack_matching_well[house])
+
+    return UNKNOWN_NODE, UNKNOWN_NODE, False
+
+
+
+def complete_matching(duplicate_graph: Graph, M: Matching, vectorized: bool = True) -> Matching:
+    '''
+    Method runs steps 4-10 of hungarian algorithm - augments given matching until it is
+    perfect. Labels of the graph have to be feasible and every matched edge tight.
+
+    Parameters:
+    ----------
+    duplicate_graph : Graph
+        graph with duplicated wells and feasible labeling
+    M : Matching
+        (partial) matching consisting of tight edges (counters of duplicate_graph.statistics,
+        if set, are updated and its callback is called after every augmentation)
+    vectorized : bool, optional
+        whether the NumPy-vectorized inner loops should be used instead of the
+        per-element ones, by default True
+
+    Returns:
+    -------
+    Optimal matching.
+    '''
+    if vectorized:
+        find_root, find_path, modify_labels, refine_tree = (
+            find_root_of_alternating_path_vectorized, find_augmenting_path_vectorized,
+            label_modification_vectorized, refine_augmenting_tree_with_new_edges_vectorized
+        )
+    else:
+        find_root, find_path, modify_labels, refine_tree = (
+            find_root_of_alternating_path, find_augmenting_path,
+            label_modification, refine_augmenting_tree_with_new_edges
+        )
+
+    statistics = duplicate_graph.statistics
 
     # Step 4: Optimal assignment check
     while not optimal_assignment_check(M):
 
         # Step 5: Reset alternating tree
         duplicate_graph.clean_alternating_tree()
+        if statistics is not None:
+            statistics.tree_rebuilds += 1
 
         # Step 6: Find the starting well for the search of augmenting path
-        well_root = find_root_of_alternating_path(duplicate_graph, M)
+        well_root = find_root(duplicate_graph, M)
 
         # Step 7: Construct equality graph (initialize slack)
         graph_l = equality_graph(duplicate_graph, well_root)
 
         while True:
             # Step 8: Construct augmenting path
-            last_well_in_path, last_house_in_path, found_augmenting_path = find_augmenting_path(graph_l, M)
+            visited_before = graph_l.read
+            last_well_in_path, last_house_in_path, found_augmenting_path = find_path(graph_l, M)
+            if statistics is not None:
+                statistics.visited_wells += graph_l.read - visited_before
 
             if not found_augmenting_path:
                 # Step 9: Label modification
-                duplicate_graph = label_modification(duplicate_graph)
-                last_well_in_path, last_house_in_path, found_augmenting_path = refine_augmenting_tree_with_new_edges(duplicate_graph, M)
+                if statistics is not None:
+                    statistics.add_label_modification(duplicate_graph.slack[duplicate_graph.T == FALSE].min())
+                duplicate_graph = modify_labels(duplicate_graph)
+                last_well_in_path, last_house_in_path, found_augmenting_path = refine_tree(duplicate_graph, M)
 
             if found_augmenting_path: # Goto matching modification
                 break
@@ -277,8 +466,215 @@ def run_hungryryan(input_file: str) -> Tuple[Graph, Matching]:
         if found_augmenting_path:
             # Step 10: Matching modification
             M = matching_modification(last_well_in_path, last_house_in_path, duplicate_graph, M)
+            if statistics is not None:
+                statistics.add_augmentation(M.matched_count)
+
+    return M
+
+
+def hungarian(duplicate_graph: Graph, vectorized: bool = True) -> Matching:
+    '''
+    Method runs hungarian algorithm (steps 2-10) on the graph with duplicated wells.
 
-    for x in range(graph_l.n):
-        ret += graph_l.cost_matrix[x][M.matching_house[x]]
-    print(ret)
-    return initial_graph, M
+    Parameters:
+    ----------
+    duplicate_graph : Graph
+        graph with duplicated wells
+    vectorized : bool, optional
+        whether the NumPy-vectorized inner loops should be used instead of the
+        per-element ones, by default True
+
+    Returns:
+    -------
+    Optimal matching.
+    '''
+    # Step 2: Initialize empty matching
+    M = Matching(duplicate_graph.n)
+
+    # Step 3: Initial feasible labeling
+    duplicate_graph = initial_labeling(duplicate_graph)
+
+    # Step 3a: Column reduction and greedy matching on the equality graph
+    M = greedy_matching(duplicate_graph, M)
+
+    # Steps 4-10: Augment matching until it is perfect
+    return complete_matching(duplicate_graph, M, vectorized)
+
+
+def hungarian_classic(duplicate_graph: Graph) -> Matching:
+    '''
+    Method runs hungarian algorithm with the per-element (not vectorized) inner loops.
+    '''
+    return hungarian(duplicate_graph, vectorized=False)
+
+
+def resolve_hungarian(previous_graph: Graph, previous_matching: Matching, delta: InstanceDelta, vectorized: bool = True) -> Tuple[Graph, Matching]:
+    '''
+    Method re-solves the problem after edits of the instance, starting from the previous
+    solution of hungarian algorithm instead of from scratch. Labels and matched pairs of
+    unchanged wells and houses are kept, labels of new and moved ones are set to the
+    smallest feasible values, so only the invalidated pairs have to be re-augmented.
+
+    Parameters:
+    ----------
+    previous_graph : Graph
+        graph with duplicated wells, solved by hungarian (its labels are reused)
+    previous_matching : Matching
+        optimal matching of the previous graph
+    delta : InstanceDelta
+        edits of the instance
+    vectorized : bool, optional
+        whether the NumPy-vectorized inner loops should be used, by default True
+
+    Returns:
+    -------
+    Tuple (graph with duplicated wells of the edited instance, its optimal matching).
+    '''
+    k = previous_graph.k
+    edited_graph, well_origin, house_origin = delta.apply(previous_graph)
+    # carried labels are not bounded by the distances of the edited instance, so the wide type is used
+    duplicate_graph = duplicate_wells(edited_graph, np.int64)
+    n = duplicate_graph.n
+
+    # Previous duplicate of every duplicate, duplicates of a kept well keep their order
+    duplicate_origin = np.repeat(well_origin, k)
+    carried_wells = np.flatnonzero(duplicate_origin != UNKNOWN_NODE)
+    duplicate_origin[carried_wells] = duplicate_origin[carried_wells] * k + carried_wells % k
+    carried_houses = np.flatnonzero(house_origin != UNKNOWN_NODE)
+
+    # Costs of kept pairs changed only by the difference of reflection offsets
+    offset_change = duplicate_graph.cost_offset - previous_graph.cost_offset
+    duplicate_graph.label_well[carried_wells] = previous_graph.label_well[duplicate_origin[carried_wells]].astype(np.int64) + offset_change
+    duplicate_graph.label_house[carried_houses] = previous_graph.label_house[house_origin[carried_houses]]
+
+    # Keep matched pairs of which both ends were kept
+    new_house_index = np.full(previous_graph.n, UNMATCHED_NODE, dtype=np.int64)
+    new_house_index[house_origin[carried_houses]] = carried_houses
+    previous_houses = previous_matching.matching_house[duplicate_origin[carried_wells]]
+    kept = previous_houses != UNMATCHED_NODE
+    wells, houses = carried_wells[kept], new_house_index[previous_houses[kept]]
+    kept = houses != UNMATCHED_NODE
+    wells, houses = wells[kept], houses[kept]
+
+    M = Matching(n)
+    M.matching_house[wells] = houses
+    M.matching_well[houses] = wells
+    M.matched_count = len(wells)
+
+    # Repair dual feasibility of new columns against kept rows, then of new rows against all columns
+    new_houses = np.flatnonzero(house_origin == UNKNOWN_NODE)
+    if len(new_houses) > 0 and len(carried_wells) > 0:
+        rows = np.unique(duplicate_graph.well_origin[carried_wells])
+        lowest_labels = np.full(len(duplicate_graph.cost_table), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(lowest_labels, duplicate_graph.well_origin[carried_wells], duplicate_graph.label_well[carried_wells])
+        reduced = duplicate_graph.cost_table[np.ix_(rows, new_houses)] - lowest_labels[rows, np.newaxis]
+        duplicate_graph.label_house[new_houses] = reduced.max(axis=0)
+
+    new_wells = np.flatnonzero(duplicate_origin == UNKNOWN_NODE)
+    if len(new_wells) > 0:
+        rows = duplicate_graph.well_origin[new_wells]
+        reduced = duplicate_graph.cost_table[rows].astype(np.int64) - duplicate_graph.label_house
+        duplicate_graph.label_well[new_wells] = reduced.max(axis=1)
+
+    M = complete_matching(duplicate_graph, M, vectorized)
+    return duplicate_graph, M
+
+
+def solve(wells_coordinates: np.ndarray,
+          houses_coordinates: np.ndarray,
+          k: int,
+          solver: str = DEFAULT_SOLVER,
+          statistics: Optional[SolverStatistics] = None,
+          cache: Optional[ResultCache] = None) -> Solution:
+    '''
+    Method solves the problem for coordinates held in memory, without any disk I/O.
+    Coordinates are used as given (read_input rounds them to 2 decimal places).
+
+    Parameters:
+    ----------
+    wells_coordinates : np.ndarray
+        array of shape (n, 2) with coordinates of wells
+    houses_coordinates : np.ndarray
+        array of shape (n * k, 2) with coordinates of houses
+    k : int
+        number of houses per well
+    solver : str, optional
+        name of the solver backend (see src.solvers.registry), by default DEFAULT_SOLVER
+    statistics : SolverStatistics, optional
+        counters to be updated by the solver (only hungarian backends are instrumented),
+        by default the solver is not instrumented
+    cache : ResultCache, optional
+        cache of solutions, if the instance is cached it is not solved (and statistics
+        are attached to the solution without being updated), by default nothing is cached
+
+    Returns:
+    -------
+    Solution with the assignment, its total costs and dual labels.
+    '''
+    wells_coordinates = np.asarray(wells_coordinates, dtype=float).reshape(-1, 2)
+    houses_coordinates = np.asarray(houses_coordinates, dtype=float).reshape(-1, 2)
+    n = len(wells_coordinates)
+    if len(houses_coordinates) != n * k:
+        raise ValueError(f"Expected {n * k} houses for {n} wells and {k} houses per well, got {len(houses_coordinates)}.")
+
+    initial_graph = InitialGraph(n, k, wells_coordinates, houses_coordinates)
+    solve_graph = get_solver(solver)
+
+    if cache is not None:
+        solution = cache.load(initial_graph, solver)
+        if solution is not None:
+            # nothing was solved, so the counters stay as they were passed
+            solution.statistics = statistics
+            return solution
+
+    if solves_initial_graph(solver):
+        # Steps 1-10: Solve the problem without materializing duplicated wells
+        solution = Solution(initial_graph, solve_graph(initial_graph), statistics=statistics)
+    else:
+        # Step 1: Duplicate wells
+        duplicate_graph = duplicate_wells(initial_graph)
+        duplicate_graph.statistics = statistics
+
+        # Steps 2-10: Solve the assignment problem with the selected backend
+        M = solve_graph(duplicate_graph)
+        solution = Solution(initial_graph, M, duplicate_graph, provides_labels(solver), statistics)
+
+    if cache is not None:
+        cache.store(solution, solver)
+    return solution
+
+
+def solve_input(input_file: str,
+                solver: str = DEFAULT_SOLVER,
+                statistics: Optional[SolverStatistics] = None,
+                cache: Optional[ResultCache] = None) -> Solution:
+    '''
+    Method solves the problem for given input file (in any format).
+    '''
+    # Step 0: Read and construct graph based on the input file
+    initial_graph = read_input(input_file)
+
+    return solve(initial_graph.wells_coordinates, initial_graph.houses_coordinates, initial_graph.k, solver, statistics, cache)
+
+
+def run_hungryryan(input_file: str, solver: str = DEFAULT_SOLVER, cache: Optional[ResultCache] = None) -> Tuple[Graph, Matching]:
+    '''
+    Method runs full hungarian algorithm for given input file and prints the total
+    reflected cost.
+
+    Parameters:
+    ----------
+    input_file : str
+        input file
+    solver : str, optional
+        name of the solver backend (see src.solvers.registry), by default DEFAULT_SOLVER
+    cache : ResultCache, optional
+        cache of solutions, by default nothing is cached
+
+    Returns:
+    -------
+    Tuple (solved graph, optimal matching).
+    '''
+    solution = solve_input(input_file, solver, cache=cache)
+    print(solution.reflected_total)
+    return solution.initial_graph, solution.matching
@@ -3,4 +3,37 @@ UNMATCHED_NODE = -1
 ROOT_NODE = -2
 
 FALSE = 0
-TRUE = 1
\ No newline at end of file
+TRUE = 1
+
+# Number of float64 elements of temporary arrays allowed per chunk of distance computation
+DISTANCE_CHUNK_ELEMENTS = 1 << 22
+# Distance in centi-units from the .5 rounding boundary below which the exact scalar path is used
+ROUNDING_TOLERANCE = 1e-6
+# Number of floating point spacings of the scaled value added to the tolerance, so that it grows with magnitude
+ROUNDING_SPACINGS = 4
+# Average number of indexed points per cell of a spatial grid
+GRID_POINTS_PER_CELL = 4
+# Number of nearest wells every house is connected to in sparse candidate graph
+SPARSE_HOUSE_NEIGHBOURS = 10
+# Number of nearest houses (in multiples of k) every well is connected to in sparse candidate graph
+SPARSE_WELL_NEIGHBOURS_FACTOR = 2
+# Number of wells of a single cell solved by the partitioned (approximate) mode
+PARTITION_CELL_WELLS = 128
+# Offsets (as fractions of a cell) of the grids of wells re-solved to repair boundaries of the cells
+PARTITION_REPAIR_SHIFTS = (0.5, 0.25, 0.75)
+# Solver backend of the cells of the partitioned mode
+PARTITION_SOLVER = "push_relabel"
+# Number of subgradient steps (on candidate edges) between pricing passes of the lower bound reported by the partitioned mode
+LOWER_BOUND_ITERATIONS = 300
+# Largest number of pricing passes over all (well, house) pairs of the lower bound
+LOWER_BOUND_PRICING_ROUNDS = 4
+# Number of subgradient steps without improvement of the lower bound after which steps are halved
+LOWER_BOUND_STALLED_STEPS = 20
+# Number of nearest wells of a house considered by the greedy start and exchanges of the heuristic solver
+HEURISTIC_WELL_NEIGHBOURS = 8
+# Time (in seconds) after which the heuristic solver stops improving its assignment
+HEURISTIC_TIME_BUDGET = 10.0
+# Number of best exchanges of every house from which non-conflicting improving ones are applied by a pass of the heuristic solver
+HEURISTIC_EXCHANGE_CANDIDATES = 4
+# Slowdown (in seconds) of a benchmarked phase below which it is considered noise and not reported as a regression
+MIN_COMPARED_SECONDS = 1e-3
@@ -1,10 +1,29 @@
 import numpy as np
 import math
 
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from enum import Enum, auto
 
 from src.models.constants import *
+from src.models.spatial_grid import SpatialGrid
+
+# Integer types of costs and labels, from the narrowest
+COST_DTYPES = (np.int16, np.int32, np.int64)
+# Labels stay within [0, max distance] and slacks within [0, 2 * max distance] during hungarian algorithm
+LABEL_RANGE_FACTOR = 2
+
+def rounding_ambiguous(scaled: np.ndarray) -> Tuple[np.ndarray, ...]:
+    '''
+    Returns indices of scaled values lying (numerically) on the .5 rounding boundary.
+    Error of the scaled value grows with its magnitude, so the tolerance is at least
+    ROUNDING_SPACINGS floating point spacings of the largest value (a single tolerance
+    is much cheaper than spacing of every value and only slightly more conservative).
+    '''
+    fraction = scaled - np.floor(scaled)
+    largest = float(np.abs(scaled).max()) if scaled.size > 0 else 0.0
+    tolerance = max(ROUNDING_TOLERANCE, ROUNDING_SPACINGS * float(np.spacing(largest)))
+    return np.nonzero(np.abs(fraction - 0.5) < tolerance)
+
 
 class InitialGraph:
     '''
@@ -59,80 +78,307 @@ class InitialGraph:
     def precise_distance(well_x, well_y, house_x, house_y) -> float:
         return round(math.dist([well_x, well_y], [house_x, house_y]), 6)
 
+    @staticmethod
+    def distances(wells_coordinates: np.ndarray, houses_coordinates: np.ndarray) -> np.ndarray:
+        '''
+        Vectorized counterpart of distance, computed for every (well, house) pair at once.
+
+        Parameters:
+        ----------
+        wells_coordinates : np.ndarray
+            array of shape (w, 2) with coordinates of wells
+        houses_coordinates : np.ndarray
+            array of shape (h, 2) with coordinates of houses
+
+        Returns:
+        -------
+        Array of shape (w, h) with integer distances identical to those of distance.
+        '''
+        return InitialGraph.pair_distances(wells_coordinates[:, np.newaxis], houses_coordinates[np.newaxis, :])
+
+    @staticmethod
+    def pair_distances(wells_coordinates: np.ndarray, houses_coordinates: np.ndarray) -> np.ndarray:
+        '''
+        Vectorized counterpart of distance for broadcastable arrays of coordinates, e.g.
+        two arrays of shape (m, 2) give distances of m (well, house) pairs.
+
+        Parameters:
+        ----------
+        wells_coordinates : np.ndarray
+            array of shape (..., 2) with coordinates of wells
+        houses_coordinates : np.ndarray
+            array of shape (..., 2) with coordinates of houses
+
+        Returns:
+        -------
+        Array of broadcast shape with integer distances identical to those of distance.
+        '''
+        dx = wells_coordinates[..., 0] - houses_coordinates[..., 0]
+        dy = wells_coordinates[..., 1] - houses_coordinates[..., 1]
+        scaled = np.hypot(dx, dy)
+        scaled *= 100
+
+        # cells lying (numerically) on a rounding boundary may round differently than
+        # in python's correctly rounded round(), so they are recomputed with distance
+        ambiguous = rounding_ambiguous(scaled)
+
+        # int(round(d, 2) * 100) == trunc((rint(100 * d) / 100) * 100)
+        np.rint(scaled, out=scaled)
+        scaled /= 100
+        scaled *= 100
+        result = np.trunc(scaled).astype(np.int64)
+
+        if len(ambiguous[0]) > 0:
+            wells = np.broadcast_to(wells_coordinates, result.shape + (2,))[ambiguous]
+            houses = np.broadcast_to(houses_coordinates, result.shape + (2,))[ambiguous]
+            for index, (well_x, well_y), (house_x, house_y) in zip(zip(*ambiguous), wells, houses):
+                result[index] = InitialGraph.distance(well_x, well_y, house_x, house_y)
+
+        return result
+
+    @staticmethod
+    def precise_pair_distances(wells_coordinates: np.ndarray, houses_coordinates: np.ndarray) -> np.ndarray:
+        '''
+        Vectorized counterpart of precise_distance for broadcastable arrays of coordinates.
+
+        Returns:
+        -------
+        Array of broadcast shape with distances identical to those of precise_distance.
+        '''
+        dx = wells_coordinates[..., 0] - houses_coordinates[..., 0]
+        dy = wells_coordinates[..., 1] - houses_coordinates[..., 1]
+        scaled = np.hypot(dx, dy)
+        scaled *= 10**6
+
+        ambiguous = rounding_ambiguous(scaled)
+
+        np.rint(scaled, out=scaled)
+        scaled /= 10**6
+
+        if len(ambiguous[0]) > 0:
+            wells = np.broadcast_to(wells_coordinates, scaled.shape + (2,))[ambiguous]
+            houses = np.broadcast_to(houses_coordinates, scaled.shape + (2,))[ambiguous]
+            for index, (well_x, well_y), (house_x, house_y) in zip(zip(*ambiguous), wells, houses):
+                scaled[index] = InitialGraph.precise_distance(well_x, well_y, house_x, house_y)
+
+        return scaled
+
+    def max_distance(self, chunk_size: Optional[int] = None) -> int:
+        '''
+        Returns the largest integer distance between a well and a house, computed chunk
+        of wells at a time without materializing all distances.
+        '''
+        if chunk_size is None:
+            chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(len(self.houses_coordinates), 1))
+
+        result = 0
+        for start in range(0, len(self.wells_coordinates), chunk_size):
+            chunk = InitialGraph.distances(self.wells_coordinates[start:start + chunk_size], self.houses_coordinates)
+            result = max(result, int(chunk.max(initial=0)))
+        return result
+
+    def distance_bound(self) -> int:
+        '''
+        Returns upper bound of integer distances, given by the diagonal of the bounding box
+        of all wells and houses.
+        '''
+        if len(self.wells_coordinates) == 0 or len(self.houses_coordinates) == 0:
+            return 0
+
+        lower = np.minimum(np.min(self.wells_coordinates, axis=0), np.min(self.houses_coordinates, axis=0))
+        upper = np.maximum(np.max(self.wells_coordinates, axis=0), np.max(self.houses_coordinates, axis=0))
+        return math.ceil(math.hypot(*(upper - lower)) * 100) + 1
+
+    def cost_dtype(self) -> np.dtype:
+        '''
+        Returns the narrowest integer type in which costs, labels and slacks of hungarian
+        algorithm cannot overflow.
+        '''
+        bound = LABEL_RANGE_FACTOR * self.distance_bound()
+        for dtype in COST_DTYPES:
+            if bound <= np.iinfo(dtype).max:
+                return np.dtype(dtype)
+
+        raise ValueError(f"Coordinates span distance {bound // LABEL_RANGE_FACTOR} which cannot be represented as integer cost.")
+
+    def candidate_edges(self, house_neighbours: int, well_neighbours: int) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Returns sparse set of candidate (well, house) edges found with uniform grids:
+        every house is connected to its house_neighbours nearest wells and every well to
+        its well_neighbours nearest houses.
+
+        Returns:
+        -------
+        Tuple (wells, houses) of arrays describing unique edges, sorted by well and house.
+        '''
+        houses_count = len(self.houses_coordinates)
+
+        nearest_wells = SpatialGrid(self.wells_coordinates).nearest(self.houses_coordinates, house_neighbours)
+        nearest_houses = SpatialGrid(self.houses_coordinates).nearest(self.wells_coordinates, well_neighbours)
+
+        keys = np.concatenate([
+            nearest_wells.ravel().astype(np.int64) * houses_count + np.repeat(np.arange(houses_count), nearest_wells.shape[1]),
+            np.repeat(np.arange(len(self.wells_coordinates)), nearest_houses.shape[1]) * houses_count + nearest_houses.ravel(),
+        ])
+        keys = np.unique(keys)
+
+        return keys // houses_count, keys % houses_count
+
 class Graph(InitialGraph):
     '''
     Class representing graph used throughout Hungarian algorithm.
 
+    Every original well is duplicated k times, but since all duplicates of a well share
+    the same costs, only one row per original well is stored in cost_table. Duplicate
+    well w maps to row w // k.
+
     Attributes:
     ----------
     n : int
-        number of wells in a graph. Must be equal to k.
+        number of well duplicates in a graph. Equal to the number of houses.
     k : int
-        number of houses per well in a graph. Must be equal to n.
-    wells : List[Node]
-        wells belonging to the given graph
-    houses : List[Node]
-        houses belonging to the given graph
+        number of duplicates of every original well
+    cost_table : np.ndarray
+        array of shape (n // k, n) with reflected costs of original wells
+    well_origin : np.ndarray
+        index of the original well of every duplicate
+    cost_offset : int
+        maximal distance, from which the costs are reflected (cost = cost_offset - distance)
+    dtype : np.dtype
+        integer type of costs, labels and slacks
+    statistics : SolverStatistics
+        counters updated by hungarian algorithm, None if it is not instrumented
     '''
 
     def __init__(self, 
                  n: int, 
                  wells_coordinates: np.ndarray, 
-                 houses_coordinates: np.ndarray
+                 houses_coordinates: np.ndarray,
+                 k: int = 1,
+                 dtype: Optional[np.dtype] = None,
+                 compute_distances: bool = True
                  ) -> None:
         '''
         Parameters:
         ----------
         n : int
-            number of wells
-        k : int
-            number of houses per well
-        wells_coords : List[np.ndarray]
-            list of coordinates of wells
-        houses_coords : List[np.ndarray]
-            list of coordinates of houses
+            number of well duplicates
+        wells_coords : np.ndarray
+            coordinates of original (not duplicated) wells
+        houses_coords : np.ndarray
+            coordinates of houses
+        k : int, optional
+            number of duplicates of every well, by default 1
+        dtype : np.dtype, optional
+            integer type of costs and labels, by default the narrowest one which
+            cannot overflow for the bounding box of given coordinates
+        compute_distances : bool, optional
+            whether the cost table is filled, by default True, otherwise compute_distances
+            has to be called before the graph is used
         '''
         self.n = n
+        self.k = k
 
         self.wells_coordinates = wells_coordinates
         self.houses_coordinates = houses_coordinates
+        self.dtype = np.dtype(dtype) if dtype is not None else self.cost_dtype()
+        self.statistics = None
+
+        self.well_origin = np.arange(self.n, dtype=np.int32) // self.k
 
-        self.label_well = np.zeros(self.n, dtype=np.int32)
-        self.label_house = np.zeros(self.n, dtype=np.int32)
+        self.label_well = np.zeros(self.n, dtype=self.dtype)
+        self.label_house = np.zeros(self.n, dtype=self.dtype)
 
-        self.cost_matrix = np.empty((self.n, self.n), dtype=np.int32)
+        self.cost_table = np.empty((len(self.wells_coordinates), self.n), dtype=self.dtype)
 
-        self.compute_distances()
+        if compute_distances:
+            self.compute_distances()
         self.clean_alternating_tree()
 
-    def compute_distances(self):
-        for well in range(self.n):
-            for house in range(self.n):
-                well_x, well_y = self.wells_coordinates[well]
-                house_x, house_y = self.houses_coordinates[house]
-                self.cost_matrix[well][house] = InitialGraph.distance(well_x, well_y, house_x, house_y)
+    @property
+    def cost_matrix(self) -> np.ndarray:
+        '''
+        Full (n, n) cost matrix of duplicated wells. Materializes k copies of every row,
+        so it should only be used by code which requires dense matrix.
+        '''
+        return np.repeat(self.cost_table, self.k, axis=0)
+
+    def cost_row(self, well: int) -> np.ndarray:
+        '''
+        Returns (read-only by convention) view of costs of given well duplicate.
+        '''
+        return self.cost_table[well // self.k]
+
+    def minimization_costs(self) -> np.ndarray:
+        '''
+        Converts reflected costs (maximized by hungarian algorithm) back into non-negative
+        int64 costs to be minimized, one row per original well. Differs from the distances
+        only by a constant, so the optimal assignments are the same.
+        '''
+        costs = self.cost_table.astype(np.int64)
+        if costs.size > 0:
+            np.subtract(costs.max(), costs, out=costs)
+        return costs
+
+    def compute_distances(self, chunk_size: Optional[int] = None):
+        '''
+        Fills cost table with reflected distances (max - distance), chunk of wells at a time.
+
+        Parameters:
+        ----------
+        chunk_size : int, optional
+            number of original wells processed at once, by default chosen so that temporary
+            arrays hold at most DISTANCE_CHUNK_ELEMENTS elements
+        '''
+        wells_count = len(self.cost_table)
+        if chunk_size is None:
+            chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(self.n, 1))
 
-        self.cost_matrix = self.cost_matrix.max() - self.cost_matrix
+        for start in range(0, wells_count, chunk_size):
+            end = min(start + chunk_size, wells_count)
+            self.cost_table[start:end] = InitialGraph.distances(self.wells_coordinates[start:end], self.houses_coordinates)
+
+        self.cost_offset = int(self.cost_table.max()) if self.cost_table.size > 0 else 0
+        np.subtract(self.cost_offset, self.cost_table, out=self.cost_table)
 
     def initial_labeling(self):
-        for well in range(self.n):
-            for house in range(self.n):
-                self.label_well[well] = max(self.label_well[well], self.cost_matrix[well][house])
+        if self.cost_table.size > 0:
+            np.maximum(self.label_well, self.cost_table.max(axis=1)[self.well_origin], out=self.label_well)
 
     def compute_slack(self, root):
-        for house in range(self.n):
-            self.slack[house] = self.label_well[root] + self.label_house[house] - self.cost_matrix[root][house]
-            self.slack_matching_well[house] = root
+        self.slack[:] = self.label_well[root] + self.label_house - self.cost_row(root)
+        self.slack_matching_well[:] = root
 
     def add_to_alternating_tree(self, well, previous_well):
         self.S[well] = TRUE
         self.previous_well[well] = previous_well
 
-        for house in range(self.n):
-            difference = self.label_well[well] + self.label_house[house] - self.cost_matrix[well][house]
-            if difference < self.slack[house]:
-                self.slack[house] = difference
-                self.slack_matching_well[house] = well
+        difference = self.label_well[well] + self.label_house - self.cost_row(well)
+        improved = difference < self.slack
+        self.slack[improved] = difference[improved]
+        self.slack_matching_well[improved] = well
+
+    def add_many_to_alternating_tree(self, wells: np.ndarray, previous_well: int):
+        '''
+        Adds several wells (children of the same previous well) to the alternating tree at once.
+        Result is identical to calling add_to_alternating_tree for each well in the given order.
+
+        Parameters:
+        ----------
+        wells : np.ndarray
+            wells to be added to the tree
+        previous_well : int
+            well from which given wells were reached
+        '''
+        self.S[wells] = TRUE
+        self.previous_well[wells] = previous_well
+
+        differences = self.label_well[wells, np.newaxis] + self.label_house - self.cost_table[self.well_origin[wells]]
+        best = differences.argmin(axis=0)
+        best_difference = differences[best, np.arange(self.n)]
+        improved = best_difference < self.slack
+        self.slack[improved] = best_difference[improved]
+        self.slack_matching_well[improved] = wells[best[improved]]
 
     def clean_alternating_tree(self):
         # Augment first part
@@ -144,5 +390,5 @@ class Graph(InitialGraph):
         self.S = np.full(self.n, FALSE, dtype=np.int32)
         self.T = np.full(self.n, FALSE, dtype=np.int32)
 
-        self.slack = np.empty(self.n, dtype=np.int32)
+        self.slack = np.empty(self.n, dtype=self.dtype)
         self.slack_matching_well = np.empty(self.n, dtype=np.int32)
@@ -0,0 +1,96 @@
+import numpy as np
+
+from typing import Dict, Iterable, Optional, Tuple
+from src.models.graph import InitialGraph
+from src.models.constants import *
+
+
+class InstanceDelta():
+    '''
+    Class represents a set of edits of the problem instance. Moved wells and houses are
+    treated as removed and added again at the new position, so they keep no previous
+    assignment.
+
+    Attributes:
+    ----------
+    moved_wells : Dict[int, Tuple[float, float]]
+        new coordinates of moved wells
+    moved_houses : Dict[int, Tuple[float, float]]
+        new coordinates of moved houses
+    removed_wells : np.ndarray
+        indices of removed wells
+    removed_houses : np.ndarray
+        indices of removed houses
+    added_wells : np.ndarray
+        array of shape (a, 2) with coordinates of added wells
+    added_houses : np.ndarray
+        array of shape (b, 2) with coordinates of added houses
+    '''
+
+    def __init__(self,
+                 moved_wells: Optional[Dict[int, Tuple[float, float]]] = None,
+                 moved_houses: Optional[Dict[int, Tuple[float, float]]] = None,
+                 removed_wells: Iterable[int] = (),
+                 removed_houses: Iterable[int] = (),
+                 added_wells: Iterable[Tuple[float, float]] = (),
+                 added_houses: Iterable[Tuple[float, float]] = ()
+                 ) -> None:
+        '''
+        Constructor of the edits. Indices refer to wells and houses of the edited instance.
+        '''
+        self.moved_wells = dict(moved_wells or {})
+        self.moved_houses = dict(moved_houses or {})
+        self.removed_wells = np.asarray(list(removed_wells), dtype=np.int64)
+        self.removed_houses = np.asarray(list(removed_houses), dtype=np.int64)
+        self.added_wells = np.asarray(list(added_wells), dtype=float).reshape(-1, 2)
+        self.added_houses = np.asarray(list(added_houses), dtype=float).reshape(-1, 2)
+
+    @staticmethod
+    def edit_points(points: np.ndarray, moved: Dict[int, Tuple[float, float]], removed: np.ndarray, added: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Method applies edits to a set of points. Kept points preserve their order and are
+        followed by moved and added points.
+
+        Returns:
+        -------
+        Tuple (coordinates of edited points, index of the previous point of every edited
+        point or UNKNOWN_NODE if the point is new or moved).
+        '''
+        kept = np.ones(len(points), dtype=bool)
+        kept[removed] = False
+        moved_indices = np.fromiter(moved.keys(), dtype=np.int64, count=len(moved))
+        kept[moved_indices] = False
+
+        moved_points = np.asarray(list(moved.values()), dtype=float).reshape(-1, 2)
+        coordinates = np.concatenate([np.asarray(points)[kept], moved_points, added])
+
+        origin = np.full(len(coordinates), UNKNOWN_NODE, dtype=np.int64)
+        origin[:np.count_nonzero(kept)] = np.flatnonzero(kept)
+        return coordinates, origin
+
+    def apply(self, initial_graph: InitialGraph) -> Tuple[InitialGraph, np.ndarray, np.ndarray]:
+        '''
+        Method applies edits to the instance.
+
+        Parameters:
+        ----------
+        initial_graph : InitialGraph
+            instance to be edited
+
+        Returns:
+        -------
+        Tuple (edited instance, previous index of every well, previous index of every house),
+        in which new and moved wells and houses have previous index UNKNOWN_NODE.
+        '''
+        wells_coordinates, well_origin = InstanceDelta.edit_points(
+            initial_graph.wells_coordinates, self.moved_wells, self.removed_wells, self.added_wells
+        )
+        houses_coordinates, house_origin = InstanceDelta.edit_points(
+            initial_graph.houses_coordinates, self.moved_houses, self.removed_houses, self.added_houses
+        )
+
+        n, k = len(wells_coordinates), initial_graph.k
+        if len(houses_coordinates) != n * k:
+            raise ValueError(f"Edited instance has {len(houses_coordinates)} houses, but {n} wells require {n * k} of them.")
+
+        return InitialGraph(n, k, wells_coordinates, houses_coordinates), well_origin, house_origin
@@ -0,0 +1,107 @@
+import numpy as np
+
+from typing import Optional
+from src.models.graph import Graph, InitialGraph
+from src.models.matching import Matching
+from src.models.solver_statistics import SolverStatistics
+
+
+class Solution():
+    '''
+    Class represents solution of the problem.
+
+    Attributes:
+    ----------
+    initial_graph : InitialGraph
+        solved graph with wells and houses
+    graph : Graph
+        graph with duplicated wells used by the solver, None for solvers taking
+        InitialGraph directly
+    matching : Matching
+        optimal matching, in which well w is represented by duplicates w * k ... w * k + k - 1
+    houses_of_well : np.ndarray
+        array of shape (n, k) with houses assigned to every well
+    well_of_house : np.ndarray
+        well assigned to every house
+    total_cost : int
+        sum of integer distances (in hundredths) of the assigned pairs
+    precise_total_cost : float
+        sum of precise distances of the assigned pairs
+    max_distance : int
+        largest distance between a well and a house, from which the costs are reflected
+    reflected_total : int
+        maximized total of reflected costs (k * n * max distance - total_cost)
+    label_well : np.ndarray
+        dual labels of well duplicates, None if the solver does not provide them
+    label_house : np.ndarray
+        dual labels of houses, None if the solver does not provide them
+    statistics : SolverStatistics
+        counters of the work done by the solver, None if it was not instrumented
+    lower_bound : int
+        lower bound of the optimal total_cost reported by approximate solvers, None if
+        the matching is optimal (or no bound is known)
+    '''
+
+    def __init__(self,
+                 initial_graph: InitialGraph,
+                 matching: Matching,
+                 graph: Optional[Graph] = None,
+                 labels: bool = False,
+                 statistics: Optional[SolverStatistics] = None,
+                 lower_bound: Optional[int] = None,
+                 max_distance: Optional[int] = None) -> None:
+        '''
+        Parameters:
+        ----------
+        initial_graph : InitialGraph
+            solved graph with wells and houses
+        matching : Matching
+            optimal matching
+        graph : Graph, optional
+            graph with duplicated wells used by the solver
+        labels : bool, optional
+            whether labels of the graph are dual labels of the matching
+        statistics : SolverStatistics, optional
+            counters of the work done by the solver
+        lower_bound : int, optional
+            lower bound of the optimal total cost of an approximate matching
+        max_distance : int, optional
+            largest distance between a well and a house if known, by default taken
+            from the graph or computed
+        '''
+        self.initial_graph = initial_graph
+        self.graph = graph
+        self.matching = matching
+
+        n, k = initial_graph.n, initial_graph.k
+        self.houses_of_well = matching.matching_house.reshape(n, k)
+        self.well_of_house = matching.matching_well // k if k > 0 else matching.matching_well
+
+        wells_coordinates = np.asarray(initial_graph.wells_coordinates)[np.arange(matching.n) // max(k, 1)]
+        houses_coordinates = np.asarray(initial_graph.houses_coordinates)[matching.matching_house]
+
+        distances = InitialGraph.pair_distances(wells_coordinates, houses_coordinates)
+        self.total_cost = int(distances.sum())
+        if max_distance is None:
+            max_distance = graph.cost_offset if graph is not None else initial_graph.max_distance()
+        self.max_distance = max_distance
+        self.reflected_total = matching.n * max_distance - self.total_cost
+
+        # summed in the order of write_to_output, so that totals are identical
+        precise_distances = InitialGraph.precise_pair_distances(wells_coordinates, houses_coordinates)
+        self.precise_total_cost = float(np.cumsum(precise_distances)[-1]) if matching.n > 0 else 0
+
+        self.label_well = graph.label_well if graph is not None and labels else None
+        self.label_house = graph.label_house if graph is not None and labels else None
+        self.statistics = statistics
+        self.lower_bound = lower_bound
+
+    @property
+    def optimality_gap(self) -> Optional[float]:
+        '''
+        Relative gap between total_cost and lower_bound, the matching is at most this much
+        worse than the optimal one. None if no lower bound is known.
+        '''
+        if self.lower_bound is None:
+            return None
+        return (self.total_cost - self.lower_bound) / max(self.lower_bound, 1)
@@ -0,0 +1,52 @@
+from typing import Callable, Dict, Optional
+
+
+class SolverStatistics():
+    '''
+    Class represents counters of the work done by hungarian algorithm.
+
+    Attributes:
+    ----------
+    augmentations : int
+        number of matching modifications (augmenting paths found)
+    label_modifications : int
+        number of label modifications
+    visited_wells : int
+        number of wells visited by the search of augmenting paths
+    tree_rebuilds : int
+        number of times the alternating tree was cleaned and rebuilt from a new root
+    delta_sum : int
+        sum of deltas applied by label modifications
+    matched_count : int
+        size of the matching after the last augmentation
+    callback : Callable[[SolverStatistics], None]
+        function called after every augmentation, None if no progress is reported
+    '''
+
+    def __init__(self, callback: Optional[Callable[['SolverStatistics'], None]] = None) -> None:
+        self.augmentations = 0
+        self.label_modifications = 0
+        self.visited_wells = 0
+        self.tree_rebuilds = 0
+        self.delta_sum = 0
+        self.matched_count = 0
+        self.callback = callback
+
+    def add_label_modification(self, delta: int) -> None:
+        self.label_modifications += 1
+        self.delta_sum += int(delta)
+
+    def add_augmentation(self, matched_count: int) -> None:
+        self.augmentations += 1
+        self.matched_count = matched_count
+        if self.callback is not None:
+            self.callback(self)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "augmentations": self.augmentations,
+            "label_modifications": self.label_modifications,
+            "visited_wells": self.visited_wells,
+            "tree_rebuilds": self.tree_rebuilds,
+            "delta_sum": self.delta_sum,
+        }
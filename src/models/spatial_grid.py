@@ -0,0 +1,128 @@
+import numpy as np
+
+from src.models.constants import *
+
+
+class SpatialGrid:
+    '''
+    Class representing uniform grid over a set of points, used to find nearest points
+    without computing distances between all pairs.
+
+    Attributes:
+    ----------
+    points : np.ndarray
+        array of shape (m, 2) with indexed points
+    origin : np.ndarray
+        lower-left corner of the grid
+    cell_size : float
+        side length of a single (square) cell
+    shape : np.ndarray
+        number of cells along x and y axis
+    order : np.ndarray
+        indices of points sorted by their cell
+    cell_start : np.ndarray
+        position in order at which points of given cell start
+    '''
+
+    def __init__(self, points: np.ndarray, points_per_cell: int = GRID_POINTS_PER_CELL) -> None:
+        '''
+        Parameters:
+        ----------
+        points : np.ndarray
+            array of shape (m, 2) with points to be indexed
+        points_per_cell : int, optional
+            average number of points per cell
+        '''
+        self.points = points
+        self.origin = points.min(axis=0) if len(points) > 0 else np.zeros(2)
+        extent = np.maximum(points.max(axis=0) - self.origin, 0) if len(points) > 0 else np.zeros(2)
+
+        cells_count = max(1, len(points) // points_per_cell)
+        area = extent[0] * extent[1]
+        self.cell_size = max(float(np.sqrt(area / cells_count)) if area > 0 else float(extent.max()) / cells_count, 1e-9)
+        self.shape = (extent // self.cell_size).astype(np.int64) + 1
+
+        cells = self.cell_id(self.cell_of(points))
+        self.order = np.argsort(cells, kind='stable')
+        self.cell_start = np.searchsorted(cells[self.order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def cell_of(self, points: np.ndarray) -> np.ndarray:
+        '''
+        Returns (x, y) cells containing given points, points outside the grid are clipped
+        to the nearest border cell.
+        '''
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def cell_id(self, cells: np.ndarray) -> np.ndarray:
+        return cells[..., 0] * self.shape[1] + cells[..., 1]
+
+    def block(self, cell: np.ndarray, radius: int) -> np.ndarray:
+        '''
+        Returns indices of points lying in cells within given Chebyshev radius of the cell.
+        '''
+        x_start, x_end = max(cell[0] - radius, 0), min(cell[0] + radius, self.shape[0] - 1)
+        y_start, y_end = max(cell[1] - radius, 0), min(cell[1] + radius, self.shape[1] - 1)
+
+        rows = np.arange(x_start, x_end + 1) * self.shape[1]
+        starts = self.cell_start[rows + y_start]
+        ends = self.cell_start[rows + y_end + 1]
+        return np.concatenate([self.order[start:end] for start, end in zip(starts, ends)])
+
+    def nearest(self, queries: np.ndarray, count: int) -> np.ndarray:
+        '''
+        Method finds count nearest indexed points of every query point. Queries sharing
+        a cell are processed together, searching rings of cells of growing radius until
+        no point outside the searched block can be closer.
+
+        Parameters:
+        ----------
+        queries : np.ndarray
+            array of shape (q, 2) with query points
+        count : int
+            number of nearest points to be found (capped at number of indexed points)
+
+        Returns:
+        -------
+        Array of shape (q, count) with indices of nearest points, closest first.
+        '''
+        count = min(count, len(self.points))
+        result = np.empty((len(queries), count), dtype=np.int64)
+        if count == 0 or len(queries) == 0:
+            return result
+
+        query_cells = self.cell_of(queries)
+        query_ids = self.cell_id(query_cells)
+        query_order = np.argsort(query_ids, kind='stable')
+        groups = np.flatnonzero(np.diff(query_ids[query_order], prepend=-1))
+        max_radius = int(self.shape.max())
+
+        for start, end in zip(groups, np.append(groups[1:], len(queries))):
+            members = query_order[start:end]
+            cell = query_cells[members[0]]
+
+            # queries clipped into a border cell lie outside of it, which weakens the bound
+            cell_low = self.origin + cell * self.cell_size
+            outside = np.maximum(np.maximum(cell_low - queries[members], queries[members] - cell_low - self.cell_size), 0)
+            offset = float(np.hypot(outside[:, 0], outside[:, 1]).max())
+
+            radius = 0
+            while True:
+                candidates = self.block(cell, radius)
+                if len(candidates) >= count:
+                    distances = np.hypot(
+                        queries[members, 0, np.newaxis] - self.points[candidates, 0],
+                        queries[members, 1, np.newaxis] - self.points[candidates, 1]
+                    )
+                    if count < len(candidates):
+                        best = np.argpartition(distances, count - 1, axis=1)[:, :count]
+                    else:
+                        best = np.broadcast_to(np.arange(count), (len(members), count))
+                    best_distances = np.take_along_axis(distances, best, axis=1)
+                    if best_distances.max() <= radius * self.cell_size - offset or radius >= max_radius:
+                        order = np.argsort(best_distances, axis=1, kind='stable')
+                        result[members] = candidates[np.take_along_axis(best, order, axis=1)]
+                        break
+                radius += 1
+
+        return result
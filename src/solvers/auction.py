@@ -0,0 +1,137 @@
+import numpy as np
+from typing import Tuple
+
+from src.models.graph import Graph
+from src.models.matching import Matching
+from src.models.constants import *
+
+# Factor by which epsilon is divided between consecutive scaling phases
+AUCTION_EPSILON_FACTOR = 4
+
+
+def bidding(benefits: np.ndarray, prices: np.ndarray, well_origin: np.ndarray, bidders: np.ndarray, epsilon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Method computes bids of all unassigned wells at once (Jacobi bidding).
+
+    Duplicates of the same well are identical bidders, so they bid together for their
+    m best houses (m being the number of bidding duplicates), each paying the difference
+    to the (m + 1)-th best value plus epsilon. This keeps epsilon-complementary slackness
+    for every duplicate and avoids duplicates outbidding each other.
+
+    Parameters:
+    ----------
+    benefits : np.ndarray
+        array of shape (n // k, n) with scaled benefits of original wells
+    prices : np.ndarray
+        current prices of houses
+    well_origin : np.ndarray
+        index of the original well of every duplicate
+    bidders : np.ndarray
+        unassigned well duplicates
+    epsilon : int
+        minimal bid increment
+
+    Returns:
+    -------
+    Tuple (bidders ordered by original well, house each of them bids for, bid value).
+    '''
+    n = len(prices)
+    bidders = bidders[np.argsort(well_origin[bidders], kind='stable')]
+    origins, first_bidder, counts = np.unique(well_origin[bidders], return_index=True, return_counts=True)
+
+    houses = np.empty(len(bidders), dtype=np.int64)
+    bids = np.empty(len(bidders), dtype=np.int64)
+
+    chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(n, 1))
+    for start in range(0, len(origins), chunk_size):
+        end = min(start + chunk_size, len(origins))
+        chunk_counts = counts[start:end]
+        candidates = min(int(chunk_counts.max()) + 1, n)
+
+        values = benefits[origins[start:end]] - prices
+        if candidates < n:
+            best = np.argpartition(-values, candidates - 1, axis=1)[:, :candidates]
+        else:
+            best = np.broadcast_to(np.arange(n), values.shape)
+        best_values = np.take_along_axis(values, best, axis=1)
+        order = np.argsort(-best_values, axis=1, kind='stable')
+        best = np.take_along_axis(best, order, axis=1)
+        best_values = np.take_along_axis(best_values, order, axis=1)
+
+        # value of the first house not bid for by the duplicates of a given well
+        rows = np.arange(end - start)
+        next_values = best_values[rows, np.minimum(chunk_counts, n - 1)]
+        next_values = np.where(chunk_counts < n, next_values, best_values[rows, chunk_counts - 1])
+
+        chunk_bidders = np.arange(first_bidder[start], first_bidder[end - 1] + chunk_counts[-1])
+        bidder_rows = np.repeat(rows, chunk_counts)
+        bidder_ranks = chunk_bidders - first_bidder[start:end][bidder_rows]
+
+        chunk_houses = best[bidder_rows, bidder_ranks]
+        houses[chunk_bidders] = chunk_houses
+        bids[chunk_bidders] = prices[chunk_houses] + best_values[bidder_rows, bidder_ranks] - next_values[bidder_rows] + epsilon
+
+    return bidders, houses, bids
+
+
+def auction_phase(benefits: np.ndarray, prices: np.ndarray, well_origin: np.ndarray, epsilon: int, matching: Matching) -> None:
+    '''
+    Method runs forward auction until every well is assigned, starting from empty
+    assignment and given prices.
+    '''
+    matching.matching_house[:] = UNMATCHED_NODE
+    matching.matching_well[:] = UNMATCHED_NODE
+
+    bidders = np.arange(matching.n)
+    while len(bidders) > 0:
+        bidders, houses, bids = bidding(benefits, prices, well_origin, bidders, epsilon)
+
+        # every house is won by its highest bidder (lowest well on ties)
+        order = np.lexsort((bidders, -bids, houses))
+        won_houses, winners = np.unique(houses[order], return_index=True)
+        winners = order[winners]
+
+        previous_wells = matching.matching_well[won_houses]
+        outbid = previous_wells[previous_wells != UNMATCHED_NODE]
+        matching.matching_house[outbid] = UNMATCHED_NODE
+
+        matching.matching_well[won_houses] = bidders[winners]
+        matching.matching_house[bidders[winners]] = won_houses
+        prices[won_houses] = bids[winners]
+
+        bidders = np.flatnonzero(matching.matching_house == UNMATCHED_NODE)
+
+
+def auction(graph: Graph) -> Matching:
+    '''
+    Method solves the assignment problem with forward auction algorithm with
+    epsilon-scaling. Benefits are multiplied by (n + 1), so that final epsilon equal
+    to 1 is smaller than 1/n of the original integer costs, which guarantees optimality.
+
+    Parameters:
+    ----------
+    graph : Graph
+        graph with duplicated wells
+
+    Returns:
+    -------
+    Optimal matching.
+    '''
+    n = graph.n
+    matching = Matching(n)
+    if n == 0:
+        return matching
+
+    benefits = graph.cost_table.astype(np.int64) * (n + 1)
+    prices = np.zeros(n, dtype=np.int64)
+
+    epsilon = max(1, int(benefits.max()) // AUCTION_EPSILON_FACTOR)
+    while True:
+        auction_phase(benefits, prices, graph.well_origin, epsilon, matching)
+        if epsilon == 1:
+            break
+        epsilon = max(1, epsilon // AUCTION_EPSILON_FACTOR)
+
+    matching.matched_count = n
+
+    return matching
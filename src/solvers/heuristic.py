@@ -0,0 +1,324 @@
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+from src.models.graph import InitialGraph
+from src.models.matching import Matching
+from src.models.spatial_grid import SpatialGrid
+from src.models.constants import *
+
+
+class HeuristicResult():
+    '''
+    Class represents result of the heuristic solver.
+
+    Attributes:
+    ----------
+    matching : Matching
+        perfect matching, in which well w is represented by duplicates w * k ... w * k + k - 1
+    total_cost : int
+        sum of integer distances (in hundredths) of the assigned pairs
+    passes : int
+        number of improvement passes of the local search
+    exchanges : int
+        number of exchanges of houses applied by the local search
+    '''
+
+    def __init__(self, matching: Matching, total_cost: int, passes: int, exchanges: int) -> None:
+        self.matching = matching
+        self.total_cost = total_cost
+        self.passes = passes
+        self.exchanges = exchanges
+
+
+def assign_remaining_houses(wells_coordinates: np.ndarray, houses_coordinates: np.ndarray, capacity: np.ndarray, well_of_house: np.ndarray) -> None:
+    '''
+    Method assigns unassigned houses in a single pass over wells with free capacity.
+    Wells closest to any unassigned house go first and every well takes its nearest
+    unassigned houses up to its capacity, so the pass always completes the assignment.
+    Arrays describing the assignment are updated in place.
+    '''
+    remaining = np.flatnonzero(well_of_house == UNMATCHED_NODE)
+    available = np.flatnonzero(capacity > 0)
+    if len(remaining) == 0:
+        return
+
+    nearest = remaining[SpatialGrid(houses_coordinates[remaining]).nearest(wells_coordinates[available], 1)[:, 0]]
+    gaps = wells_coordinates[available] - houses_coordinates[nearest]
+    order = np.argsort(np.hypot(gaps[:, 0], gaps[:, 1]), kind='stable')
+
+    for well in available[order].tolist():
+        distances = np.hypot(houses_coordinates[remaining, 0] - wells_coordinates[well, 0], houses_coordinates[remaining, 1] - wells_coordinates[well, 1])
+        count = int(capacity[well])
+        taken = np.argpartition(distances, count - 1)[:count] if count < len(remaining) else np.arange(len(remaining))
+
+        well_of_house[remaining[taken]] = well
+        capacity[well] = 0
+        remaining = np.delete(remaining, taken)
+
+
+def greedy_assignment(initial_graph: InitialGraph, well_neighbours: int = HEURISTIC_WELL_NEIGHBOURS) -> np.ndarray:
+    '''
+    Method assigns every house to a near well which still has free capacity. Houses
+    propose to their nearest available wells in rounds and every well accepts the closest
+    proposing houses up to its capacity. Houses, whose well_neighbours nearest wells are
+    all full, are assigned by a single pass over the wells with free capacity (see
+    assign_remaining_houses).
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses
+    well_neighbours : int, optional
+        number of nearest wells a house proposes to, by default HEURISTIC_WELL_NEIGHBOURS
+
+    Returns:
+    -------
+    Well assigned to every house.
+    '''
+    wells_coordinates = np.asarray(initial_graph.wells_coordinates)
+    houses_coordinates = np.asarray(initial_graph.houses_coordinates)
+
+    capacity = np.full(initial_graph.n, initial_graph.k, dtype=np.int64)
+    well_of_house = np.full(len(houses_coordinates), UNMATCHED_NODE, dtype=np.int64)
+
+    candidates = SpatialGrid(wells_coordinates).nearest(houses_coordinates, well_neighbours)
+    distances = InitialGraph.pair_distances(wells_coordinates[candidates], houses_coordinates[:, np.newaxis])
+
+    while True:
+        free = capacity[candidates] > 0
+        proposing = np.flatnonzero(free.any(axis=1) & (well_of_house == UNMATCHED_NODE))
+        if len(proposing) == 0:
+            break
+
+        choice = free[proposing].argmax(axis=1)
+        wells = candidates[proposing, choice]
+        proposal_distances = distances[proposing, choice]
+
+        # proposals sorted by well and distance, every well accepts its first ones
+        order = np.lexsort((proposing, proposal_distances, wells))
+        wells, proposing = wells[order], proposing[order]
+        first = np.searchsorted(wells, wells)
+        accepted = np.arange(len(wells)) - first < capacity[wells]
+
+        well_of_house[proposing[accepted]] = wells[accepted]
+        np.subtract.at(capacity, wells[accepted], 1)
+
+    assign_remaining_houses(wells_coordinates, houses_coordinates, capacity, well_of_house)
+    return well_of_house
+
+
+def select_exchanges(improving: np.ndarray, partners: np.ndarray, gains: np.ndarray, houses_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Method selects improving exchanges not sharing any house, as they would be selected
+    one by one in order of decreasing gain. In every round, exchanges which are the best
+    remaining ones of both their houses are selected at once and exchanges sharing a house
+    with them are dropped.
+
+    Returns:
+    -------
+    Tuple (first houses, second houses) of the selected exchanges.
+    '''
+    order = np.argsort(-gains, kind='stable')
+    improving, partners = improving[order], partners[order]
+    taken = np.zeros(houses_count, dtype=bool)
+    rank = np.empty(houses_count, dtype=np.int64)
+
+    first, second = [], []
+    while len(improving) > 0:
+        ranks = np.arange(len(improving))
+        rank[improving] = len(improving)
+        rank[partners] = len(improving)
+        np.minimum.at(rank, improving, ranks)
+        np.minimum.at(rank, partners, ranks)
+        selected = (rank[improving] == ranks) & (rank[partners] == ranks)
+
+        first.append(improving[selected])
+        second.append(partners[selected])
+        taken[improving[selected]] = True
+        taken[partners[selected]] = True
+
+        remaining = ~(taken[improving] | taken[partners])
+        improving, partners = improving[remaining], partners[remaining]
+
+    return np.concatenate(first), np.concatenate(second)
+
+
+def exchange_pass(initial_graph: InitialGraph,
+                  houses_of_well: np.ndarray,
+                  well_of_house: np.ndarray,
+                  house_cost: np.ndarray,
+                  nearest_wells: np.ndarray,
+                  nearest_distances: np.ndarray,
+                  near_houses: np.ndarray,
+                  near_starts: np.ndarray,
+                  active: np.ndarray,
+                  moved: np.ndarray,
+                  deadline: Optional[float] = None,
+                  exchange_candidates: int = HEURISTIC_EXCHANGE_CANDIDATES) -> Tuple[int, np.ndarray, np.ndarray]:
+    '''
+    Method finds improving exchanges of house h1 (of well a) with house h2 of one of the
+    nearest wells b of h1, reducing the total cost by d(a, h1) + d(b, h2) - d(a, h2) - d(b, h1).
+    Every active house is examined with all houses of its nearest wells, keeping its
+    exchange_candidates best exchanges, and every house moved by the previous pass is
+    examined as h2 with all houses having its new well among the nearest ones. Gains are
+    estimated with unrounded distances and only the positive ones are computed exactly.
+    All improving exchanges not sharing any house are applied at once, in order of
+    decreasing gain (see select_exchanges). Houses are examined in chunks, after the
+    deadline (time.perf_counter value) no further chunk is examined. Arrays describing
+    the assignment are updated in place.
+
+    Returns:
+    -------
+    Tuple (number of applied exchanges, houses to be examined by the next pass, houses
+    moved by this pass). Exchanges of other houses are the ones already examined, so
+    they cannot improve.
+    '''
+    wells_coordinates = np.asarray(initial_graph.wells_coordinates)
+    houses_coordinates = np.asarray(initial_graph.houses_coordinates)
+    wells_x, wells_y = np.ascontiguousarray(wells_coordinates.T)
+    houses_x, houses_y = np.ascontiguousarray(houses_coordinates.T)
+    houses_count, neighbours = nearest_wells.shape
+    k = initial_graph.k
+    chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(neighbours * k, 1))
+
+    def estimated_gains(first: np.ndarray, second: np.ndarray, first_wells: np.ndarray, second_wells: np.ndarray) -> np.ndarray:
+        first_distances = np.hypot(wells_x[second_wells] - houses_x[first], wells_y[second_wells] - houses_y[first])
+        second_distances = np.hypot(wells_x[first_wells] - houses_x[second], wells_y[first_wells] - houses_y[second])
+        return house_cost[first] + house_cost[second] - 100 * (first_distances + second_distances)
+
+    candidates = min(exchange_candidates, neighbours * k)
+    found_first, found_second = [], []
+    for start in range(0, len(active), chunk_size):
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        houses = active[start:start + chunk_size]
+        rows = np.arange(len(houses))[:, np.newaxis]
+
+        # partners are all houses of the nearest wells, shape (houses, neighbours * k)
+        partners = houses_of_well[nearest_wells[houses]].reshape(len(houses), -1)
+        own_wells = well_of_house[houses]
+        dx = wells_x[own_wells, np.newaxis] - houses_x[partners]
+        dy = wells_y[own_wells, np.newaxis] - houses_y[partners]
+        gains = house_cost[houses, np.newaxis] + house_cost[partners] - np.repeat(nearest_distances[houses], k, axis=1) - 100 * np.hypot(dx, dy)
+
+        best = np.argpartition(gains, -candidates, axis=1)[:, -candidates:]
+        improving = gains[rows, best] > 0
+        found_first.append(np.broadcast_to(houses[:, np.newaxis], best.shape)[improving])
+        found_second.append(partners[rows, best][improving])
+
+    # houses having the new well of a moved house among their nearest wells, as h1
+    moved_chunk_size = max(1, chunk_size // max(neighbours, 1))
+    for start in range(0, len(moved), moved_chunk_size):
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        houses = moved[start:start + moved_chunk_size]
+        wells = well_of_house[houses]
+        counts = near_starts[wells + 1] - near_starts[wells]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        first = near_houses[np.repeat(near_starts[wells], counts) + offsets]
+        second = np.repeat(houses, counts)
+
+        improving = estimated_gains(first, second, well_of_house[first], well_of_house[second]) > 0
+        found_first.append(first[improving])
+        found_second.append(second[improving])
+
+    first = np.concatenate(found_first) if found_first else np.empty(0, dtype=np.int64)
+    second = np.concatenate(found_second) if found_second else np.empty(0, dtype=np.int64)
+    first_wells, second_wells = well_of_house[first], well_of_house[second]
+    gains = (
+        house_cost[first] + house_cost[second]
+        - InitialGraph.pair_distances(wells_coordinates[first_wells], houses_coordinates[second])
+        - InitialGraph.pair_distances(wells_coordinates[second_wells], houses_coordinates[first])
+    )
+    improving = gains > 0
+    if not improving.any():
+        return 0, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    improving_first = first[improving]
+    first, second = select_exchanges(improving_first, second[improving], gains[improving], houses_count)
+
+    first_wells, second_wells = well_of_house[first], well_of_house[second]
+    first_slots = np.argmax(houses_of_well[first_wells] == first[:, np.newaxis], axis=1)
+    second_slots = np.argmax(houses_of_well[second_wells] == second[:, np.newaxis], axis=1)
+
+    houses_of_well[first_wells, first_slots] = second
+    houses_of_well[second_wells, second_slots] = first
+    well_of_house[first], well_of_house[second] = second_wells, first_wells
+    house_cost[first] = InitialGraph.pair_distances(wells_coordinates[second_wells], houses_coordinates[first])
+    house_cost[second] = InitialGraph.pair_distances(wells_coordinates[first_wells], houses_coordinates[second])
+
+    # moved houses and houses whose improving exchanges were not applied are examined again
+    moved = np.concatenate((first, second))
+    return len(first), np.union1d(moved, improving_first), moved
+
+
+def solve_heuristic(initial_graph: InitialGraph,
+                    time_budget: Optional[float] = HEURISTIC_TIME_BUDGET,
+                    well_neighbours: int = HEURISTIC_WELL_NEIGHBOURS) -> HeuristicResult:
+    '''
+    Method solves the problem heuristically: houses are assigned greedily to the nearest
+    wells with free capacity, then the assignment is improved by exchanges of houses
+    between nearby wells until no improving exchange exists or the time budget runs out.
+    After the first pass only exchanges of houses moved by the previous pass are examined.
+    The budget includes the greedy assignment, which is always completed. Only distances
+    to the nearest wells are computed by exchanges, so large instances never need the
+    complete cost table.
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses (wells are not duplicated)
+    time_budget : float, optional
+        time in seconds (since the start of the method) after which exchanges are no longer
+        searched for, by default HEURISTIC_TIME_BUDGET, None if passes should continue
+        until no exchange improves
+    well_neighbours : int, optional
+        number of nearest wells of a house considered, by default HEURISTIC_WELL_NEIGHBOURS
+
+    Returns:
+    -------
+    HeuristicResult with the matching, its total cost and number of improvement passes.
+    '''
+    start = time.perf_counter()
+    n, k = initial_graph.n, initial_graph.k
+    wells_coordinates = np.asarray(initial_graph.wells_coordinates)
+    houses_coordinates = np.asarray(initial_graph.houses_coordinates)
+    if n * k == 0:
+        return HeuristicResult(Matching(0), 0, 0, 0)
+
+    well_of_house = greedy_assignment(initial_graph, well_neighbours)
+    houses_of_well = np.argsort(well_of_house, kind='stable').reshape(n, k)
+    house_cost = InitialGraph.pair_distances(wells_coordinates[well_of_house], houses_coordinates)
+
+    nearest_wells = SpatialGrid(wells_coordinates).nearest(houses_coordinates, well_neighbours)
+    nearest_distances = InitialGraph.pair_distances(wells_coordinates[nearest_wells], houses_coordinates[:, np.newaxis])
+
+    # houses having well w among their nearest wells are near_houses[near_starts[w]:near_starts[w + 1]]
+    near_houses = np.argsort(nearest_wells.ravel(), kind='stable') // nearest_wells.shape[1]
+    near_starts = np.searchsorted(np.sort(nearest_wells.ravel()), np.arange(n + 1))
+
+    deadline = start + time_budget if time_budget is not None else None
+    passes = exchanges = 0
+    active, moved = np.arange(n * k), np.empty(0, dtype=np.int64)
+    while len(active) > 0 and (deadline is None or time.perf_counter() < deadline):
+        applied, active, moved = exchange_pass(
+            initial_graph, houses_of_well, well_of_house, house_cost, nearest_wells, nearest_distances,
+            near_houses, near_starts, active, moved, deadline
+        )
+        passes += 1
+        exchanges += applied
+
+    M = Matching(n * k)
+    M.matching_house[:] = houses_of_well.ravel()
+    M.matching_well[M.matching_house] = np.arange(n * k)
+    M.matched_count = n * k
+
+    return HeuristicResult(M, int(house_cost.sum()), passes, exchanges)
+
+
+def heuristic(initial_graph: InitialGraph) -> Matching:
+    '''
+    Method solves the problem heuristically (see solve_heuristic).
+    '''
+    return solve_heuristic(initial_graph).matching
@@ -0,0 +1,192 @@
+import numpy as np
+from collections import deque
+from typing import List, Tuple
+
+from src.models.graph import Graph
+from src.models.matching import Matching
+from src.models.constants import *
+
+# Sentinel larger than any reduced cost of the assignment problem
+INFINITE_COST = np.iinfo(np.int64).max // 4
+
+
+def column_reduction(costs: np.ndarray, k: int, rowsol: np.ndarray, colsol: np.ndarray, v: np.ndarray) -> None:
+    '''
+    Method performs column reduction - every column is assigned to a still free duplicate
+    of the well with its minimal cost. Columns are scanned in reverse order.
+    '''
+    n = len(colsol)
+    v[:] = costs.min(axis=0)
+    minimal_wells = costs.argmin(axis=0)
+    taken = np.zeros(len(costs), dtype=np.int64)
+
+    for house in range(n - 1, -1, -1):
+        well = minimal_wells[house]
+        if taken[well] < k:
+            duplicate = well * k + taken[well]
+            taken[well] += 1
+            rowsol[duplicate] = house
+            colsol[house] = duplicate
+
+
+def reduction_transfer(costs: np.ndarray, k: int, rowsol: np.ndarray, v: np.ndarray) -> List[int]:
+    '''
+    Method transfers reduction from assigned rows to their columns.
+
+    Returns:
+    -------
+    List of free (unassigned) rows.
+    '''
+    free = []
+    for well in range(len(rowsol)):
+        house = rowsol[well]
+        if house == UNMATCHED_NODE:
+            free.append(well)
+        elif len(v) > 1:
+            reduced = costs[well // k] - v
+            reduced[house] = INFINITE_COST
+            v[house] -= reduced.min()
+    return free
+
+
+def augmenting_row_reduction(costs: np.ndarray, k: int, free: List[int], rowsol: np.ndarray, colsol: np.ndarray, v: np.ndarray) -> List[int]:
+    '''
+    Method performs one pass of augmenting row reduction.
+
+    Returns:
+    -------
+    List of rows which remained free after the pass.
+    '''
+    todo = deque(free)
+    still_free = []
+    while todo:
+        well = todo.popleft()
+        reduced = costs[well // k] - v
+
+        # two smallest reduced costs found in a single partial sort
+        if len(reduced) > 1:
+            first, second = np.argpartition(reduced, 1)[:2].tolist()
+            if reduced[second] < reduced[first]:
+                first, second = second, first
+        else:
+            first, second = 0, 0
+        first_minimum = reduced[first]
+        second_minimum = reduced[second] if second != first else INFINITE_COST
+
+        previous_well = colsol[first]
+        if first_minimum < second_minimum:
+            v[first] -= second_minimum - first_minimum
+        elif previous_well != UNMATCHED_NODE:
+            first = second
+            previous_well = colsol[second]
+
+        rowsol[well] = first
+        colsol[first] = well
+
+        if previous_well != UNMATCHED_NODE:
+            rowsol[previous_well] = UNMATCHED_NODE
+            if first_minimum < second_minimum:
+                todo.appendleft(previous_well)
+            else:
+                still_free.append(previous_well)
+
+    return still_free
+
+
+def augment(costs: np.ndarray, k: int, free_well: int, rowsol: np.ndarray, colsol: np.ndarray, v: np.ndarray) -> None:
+    '''
+    Method finds shortest augmenting path from a free row with Dijkstra's algorithm,
+    updates column prices and augments the assignment. All columns at the minimal
+    distance are scanned at once. Duplicates of a well share their row of costs, so a
+    well is scanned only if it is reached at a smaller offset (distance minus reduced
+    cost of the reaching column) than before, and once for all its reached duplicates.
+    '''
+    n = len(colsol)
+    distance = costs[free_well // k] - v
+    predecessor = np.full(n, free_well, dtype=np.int64)
+    scanned = np.zeros(n, dtype=bool)
+    unscanned_distance = distance.copy()
+    # smallest offset at which every original well was scanned
+    well_offset = np.full(len(costs), INFINITE_COST, dtype=np.int64)
+    chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(n, 1))
+
+    while True:
+        minimum = unscanned_distance.min()
+        ready = np.flatnonzero(unscanned_distance == minimum)
+
+        exposed = ready[colsol[ready] == UNMATCHED_NODE]
+        if len(exposed) > 0:
+            end_of_path = int(exposed[0])
+            break
+
+        scanned[ready] = True
+        unscanned_distance[ready] = INFINITE_COST
+
+        # offset of every reached duplicate, only the smallest one of each well is scanned
+        wells = colsol[ready]
+        origins = wells // k
+        offsets = minimum - (costs[origins, ready] - v[ready])
+        order = np.lexsort((offsets, origins))
+        origins, first = np.unique(origins[order], return_index=True)
+        wells, offsets = wells[order[first]], offsets[order[first]]
+
+        improving = offsets < well_offset[origins]
+        origins, wells, offsets = origins[improving], wells[improving], offsets[improving]
+        well_offset[origins] = offsets
+
+        for start in range(0, len(origins), chunk_size):
+            candidates = costs[origins[start:start + chunk_size]] - v + offsets[start:start + chunk_size, np.newaxis]
+            best = candidates.argmin(axis=0)
+            candidate = candidates[best, np.arange(n)]
+
+            improved = (candidate < distance) & ~scanned
+            distance[improved] = candidate[improved]
+            unscanned_distance[improved] = candidate[improved]
+            predecessor[improved] = wells[start:start + chunk_size][best[improved]]
+
+    v[scanned] += distance[scanned] - minimum
+
+    while True:
+        well = predecessor[end_of_path]
+        colsol[end_of_path] = well
+        end_of_path, rowsol[well] = rowsol[well], end_of_path
+        if well == free_well:
+            break
+
+
+def jonker_volgenant(graph: Graph) -> Matching:
+    '''
+    Method solves the assignment problem with dense Jonker-Volgenant (LAPJV) algorithm:
+    column reduction, reduction transfer, two passes of augmenting row reduction and
+    shortest augmenting paths for the remaining free rows.
+
+    Parameters:
+    ----------
+    graph : Graph
+        graph with duplicated wells
+
+    Returns:
+    -------
+    Optimal matching.
+    '''
+    n, k = graph.n, graph.k
+    costs = graph.minimization_costs()
+
+    rowsol = np.full(n, UNMATCHED_NODE, dtype=np.int64)
+    colsol = np.full(n, UNMATCHED_NODE, dtype=np.int64)
+    v = np.zeros(n, dtype=np.int64)
+
+    if n > 0:
+        column_reduction(costs, k, rowsol, colsol, v)
+        free = reduction_transfer(costs, k, rowsol, v)
+        for _ in range(2):
+            free = augmenting_row_reduction(costs, k, free, rowsol, colsol, v)
+        for free_well in free:
+            augment(costs, k, free_well, rowsol, colsol, v)
+
+    matching = Matching(n)
+    matching.matching_house[:] = rowsol
+    matching.matching_well[:] = colsol
+    matching.matched_count = n
+
+    return matching
@@ -0,0 +1,326 @@
+import numpy as np
+from typing import Tuple
+
+from src.models.graph import Graph
+from src.models.matching import Matching
+from src.models.constants import *
+
+# Sentinel larger than any shortest path length in the residual network
+INFINITE_DISTANCE = np.iinfo(np.int64).max // 4
+
+
+class FlowNetwork:
+    '''
+    Class representing residual state of the capacitated network, in which every well
+    serves up to k houses and every house is served by exactly one well.
+
+    Since total capacity of wells equals number of houses, every well is full in the
+    optimum and its dual variable is free in sign - no source and sink nodes are needed.
+    Johnson potentials keep reduced costs cost + well_potential - house_potential
+    non-negative on unused edges and zero on edges serving houses.
+
+    Attributes:
+    ----------
+    costs : np.ndarray
+        array of shape (wells, houses) with non-negative costs of well -> house edges
+    k : int
+        capacity of every well
+    house_owner : np.ndarray
+        well serving given house, UNMATCHED_NODE if house is not served yet
+    house_cost : np.ndarray
+        cost of the edge serving given house
+    flow : np.ndarray
+        number of houses served by given well
+    well_potential : np.ndarray
+        Johnson potentials of wells
+    house_potential : np.ndarray
+        Johnson potentials of houses
+    '''
+
+    def __init__(self, costs: np.ndarray, k: int) -> None:
+        self.costs = costs
+        self.k = k
+        self.reset(*costs.shape)
+
+    def reset(self, wells: int, houses: int) -> None:
+        '''
+        Method clears the flow and potentials of the network.
+        '''
+        self.wells_count, self.houses_count = wells, houses
+        self.all_houses = np.arange(houses)
+
+        self.house_owner = np.full(houses, UNMATCHED_NODE, dtype=np.int64)
+        self.house_cost = np.zeros(houses, dtype=np.int64)
+        self.flow = np.zeros(wells, dtype=np.int64)
+
+        self.well_potential = np.zeros(wells, dtype=np.int64)
+        self.house_potential = np.zeros(houses, dtype=np.int64)
+
+    def well_edges(self, well: int) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Returns houses adjacent to given well and costs of the corresponding edges.
+        '''
+        return self.all_houses, self.costs[well]
+
+    def house_entry_potential(self, houses: np.ndarray) -> np.ndarray:
+        '''
+        Returns for every given house the minimum of cost + well_potential over its edges,
+        i.e. the largest house potential keeping reduced costs of its edges non-negative.
+        '''
+        return (self.costs[:, houses] + self.well_potential[:, np.newaxis]).min(axis=0)
+
+    def release_houses(self, houses: np.ndarray) -> None:
+        '''
+        Method stops serving given houses and lowers their potentials, so that reduced
+        costs of all their edges are non-negative again. Used to restore dual feasibility
+        after costs or edges of these houses changed, without discarding the rest of the flow.
+        '''
+        owners = self.house_owner[houses]
+        self.flow -= np.bincount(owners[owners != UNMATCHED_NODE], minlength=self.wells_count)
+        self.house_owner[houses] = UNMATCHED_NODE
+        self.house_potential[houses] = self.house_entry_potential(houses)
+
+    def initialize(self) -> int:
+        '''
+        Method sets potential of every house to the cost of its cheapest edge and serves
+        houses by their cheapest wells as long as capacities allow (column reduction).
+
+        Returns:
+        -------
+        Number of served houses.
+        '''
+        nearest_well = np.full(self.houses_count, UNMATCHED_NODE, dtype=np.int64)
+        self.house_potential[:] = INFINITE_DISTANCE
+        for well in range(self.wells_count):
+            edge_houses, edge_costs = self.well_edges(well)
+            closer = edge_costs < self.house_potential[edge_houses]
+            self.house_potential[edge_houses[closer]] = edge_costs[closer]
+            nearest_well[edge_houses[closer]] = well
+
+        reachable = np.flatnonzero(nearest_well != UNMATCHED_NODE)
+        order = reachable[np.argsort(nearest_well[reachable], kind='stable')]
+        wells = nearest_well[order]
+        rank = np.arange(len(order)) - np.searchsorted(wells, wells)
+        served, wells = order[rank < self.k], wells[rank < self.k]
+
+        self.house_owner[served] = wells
+        self.house_cost[served] = self.house_potential[served]
+        self.flow += np.bincount(wells, minlength=self.wells_count)
+        self.house_potential[nearest_well == UNMATCHED_NODE] = 0
+
+        return len(served)
+
+    def shortest_path(self, root: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, int]:
+        '''
+        Method runs Dijkstra's algorithm on reduced costs from given well to the closest
+        house which is not served yet.
+
+        Houses are not scanned on their own - a served house has a single residual edge
+        (back to its well), so distances of wells are relaxed directly from house distances
+        and every step of the algorithm scans one well (vectorized over its edges).
+
+        Returns:
+        -------
+        Tuple (well distances, house distances, well preceding every house, house preceding
+        every well, last house on the path, its distance). Distance is equal to
+        INFINITE_DISTANCE if no house can be reached.
+        '''
+        wells, houses = self.wells_count, self.houses_count
+        well_distance = np.full(wells, INFINITE_DISTANCE, dtype=np.int64)
+        well_distance[root] = 0
+        well_previous_house = np.full(wells, UNKNOWN_NODE, dtype=np.int64)
+        house_distance = np.full(houses, INFINITE_DISTANCE, dtype=np.int64)
+        house_previous_well = np.full(houses, UNKNOWN_NODE, dtype=np.int64)
+        self.house_previous_cost = np.zeros(houses, dtype=np.int64)
+
+        scanned = np.zeros(wells, dtype=bool)
+        unscanned_distance = well_distance.copy()
+        path_distance, last_house = INFINITE_DISTANCE, UNKNOWN_NODE
+
+        served = self.house_owner != UNMATCHED_NODE
+        back_cost = np.zeros(houses, dtype=np.int64)
+        back_cost[served] = self.house_potential[served] - self.well_potential[self.house_owner[served]] - self.house_cost[served]
+
+        while True:
+            well = int(unscanned_distance.argmin())
+            if unscanned_distance[well] >= path_distance:
+                break
+
+            scanned[well] = True
+            unscanned_distance[well] = INFINITE_DISTANCE
+
+            edge_houses, edge_costs = self.well_edges(well)
+            candidate = well_distance[well] + edge_costs + self.well_potential[well] - self.house_potential[edge_houses]
+            improved = np.flatnonzero((candidate < house_distance[edge_houses]) & (self.house_owner[edge_houses] != well))
+            improved_houses = edge_houses[improved]
+            house_distance[improved_houses] = candidate[improved]
+            house_previous_well[improved_houses] = well
+            self.house_previous_cost[improved_houses] = edge_costs[improved]
+
+            exposed = improved_houses[~served[improved_houses]]
+            if len(exposed) > 0:
+                best = int(house_distance[exposed].argmin())
+                if house_distance[exposed[best]] < path_distance:
+                    path_distance, last_house = int(house_distance[exposed[best]]), int(exposed[best])
+
+            reached = improved_houses[served[improved_houses]]
+            owners = self.house_owner[reached]
+            through_house = house_distance[reached] + back_cost[reached]
+            better = (through_house < well_distance[owners]) & ~scanned[owners]
+            if better.any():
+                reached, owners, through_house = reached[better], owners[better], through_house[better]
+                order = np.lexsort((through_house, owners))
+                owners, first = np.unique(owners[order], return_index=True)
+                well_distance[owners] = through_house[order[first]]
+                unscanned_distance[owners] = through_house[order[first]]
+                well_previous_house[owners] = reached[order[first]]
+
+        return well_distance, house_distance, house_previous_well, well_previous_house, last_house, path_distance
+
+    def augment(self) -> bool:
+        '''
+        Method serves one more house along the shortest path from a well with spare
+        capacity and updates Johnson potentials, so that reduced costs of residual edges
+        stay non-negative.
+
+        Returns:
+        -------
+        Boolean indicating if an augmenting path existed.
+        '''
+        root = int(np.flatnonzero(self.flow < self.k)[0])
+        well_distance, house_distance, house_previous_well, well_previous_house, house, path_distance = self.shortest_path(root)
+        if path_distance == INFINITE_DISTANCE:
+            return False
+
+        self.well_potential += np.minimum(well_distance, path_distance)
+        self.house_potential += np.minimum(house_distance, path_distance)
+
+        while True:
+            well = house_previous_well[house]
+            previous_house = well_previous_house[well]
+            self.house_owner[house] = well
+            self.house_cost[house] = self.house_previous_cost[house]
+            if previous_house == UNKNOWN_NODE:
+                self.flow[well] += 1
+                break
+            house = previous_house
+
+        return True
+
+    def complete(self) -> bool:
+        '''
+        Method augments current flow until all houses are served.
+
+        Returns:
+        -------
+        Boolean indicating if all houses could be served.
+        '''
+        exposed = int(np.count_nonzero(self.house_owner == UNMATCHED_NODE))
+        return all(self.augment() for _ in range(exposed))
+
+    def solve(self) -> bool:
+        '''
+        Method finds min-cost flow serving all houses, starting from column reduction.
+
+        Returns:
+        -------
+        Boolean indicating if all houses could be served.
+        '''
+        self.reset(self.wells_count, self.houses_count)
+        self.initialize()
+        return self.complete()
+
+    def matching(self) -> Matching:
+        '''
+        Method converts (full) flow into matching, in which well w is represented by
+        duplicates w * k ... w * k + k - 1.
+        '''
+        matching = Matching(self.houses_count)
+        houses = np.argsort(self.house_owner, kind='stable')
+        matching.matching_house[:] = houses
+        matching.matching_well[houses] = np.arange(self.houses_count)
+        matching.matched_count = self.houses_count
+
+        return matching
+
+
+class SparseFlowNetwork(FlowNetwork):
+    '''
+    Class representing flow network, in which wells are connected only to a subset
+    of houses. Edges are stored in compressed rows - edges of well w are
+    edge_houses[edge_start[w]:edge_start[w + 1]].
+    '''
+
+    def __init__(self, wells: int, houses: int, k: int, edge_wells: np.ndarray, edge_houses: np.ndarray, edge_costs: np.ndarray) -> None:
+        '''
+        Parameters:
+        ----------
+        wells : int
+            number of wells
+        houses : int
+            number of houses
+        k : int
+            capacity of every well
+        edge_wells, edge_houses, edge_costs : np.ndarray
+            endpoints and costs of edges, sorted by well
+        '''
+        self.k = k
+        self.set_edges(wells, edge_wells, edge_houses, edge_costs)
+        self.reset(wells, houses)
+
+    def set_edges(self, wells: int, edge_wells: np.ndarray, edge_houses: np.ndarray, edge_costs: np.ndarray) -> None:
+        self.edge_wells = edge_wells
+        self.edge_houses = edge_houses
+        self.edge_costs = edge_costs
+        self.edge_start = np.searchsorted(edge_wells, np.arange(wells + 1))
+
+    def well_edges(self, well: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.edge_start[well], self.edge_start[well + 1]
+        return self.edge_houses[start:end], self.edge_costs[start:end]
+
+    def house_entry_potential(self, houses: np.ndarray) -> np.ndarray:
+        position = np.full(self.houses_count, UNKNOWN_NODE, dtype=np.int64)
+        position[houses] = np.arange(len(houses))
+        incoming = np.flatnonzero(position[self.edge_houses] != UNKNOWN_NODE)
+
+        potential = np.full(len(houses), INFINITE_DISTANCE, dtype=np.int64)
+        np.minimum.at(
+            potential, position[self.edge_houses[incoming]],
+            self.edge_costs[incoming] + self.well_potential[self.edge_wells[incoming]]
+        )
+        return potential
+
+    def add_edges(self, new_wells: np.ndarray, new_houses: np.ndarray, new_costs: np.ndarray) -> None:
+        '''
+        Method adds edges to the network, keeping current flow. Houses which gained an edge
+        with negative reduced cost are released, so that the flow can be completed again.
+        '''
+        keys = np.concatenate([self.edge_wells * self.houses_count + self.edge_houses, new_wells * self.houses_count + new_houses])
+        keys, first = np.unique(keys, return_index=True)
+        costs = np.concatenate([self.edge_costs, new_costs])[first]
+        self.set_edges(self.wells_count, keys // self.houses_count, keys % self.houses_count, costs)
+
+        reduced = new_costs + self.well_potential[new_wells] - self.house_potential[new_houses]
+        self.release_houses(np.unique(new_houses[reduced < 0]))
+
+
+def min_cost_flow(graph: Graph) -> Matching:
+    '''
+    Method solves the problem as min-cost flow on the capacitated well -> house network
+    with successive shortest paths, Dijkstra's algorithm and Johnson potentials. Wells
+    are not duplicated - every well is a single node with capacity k, so a single
+    iteration costs O(wells * houses).
+
+    Parameters:
+    ----------
+    graph : Graph
+        graph with duplicated wells (only its compact cost table is used)
+
+    Returns:
+    -------
+    Optimal matching, in which well w is represented by duplicates w * k ... w * k + k - 1.
+    '''
+    network = FlowNetwork(graph.minimization_costs(), graph.k)
+    network.solve()
+
+    return network.matching()
@@ -0,0 +1,237 @@
+import numpy as np
+
+from src.hungryryan import greedy_matching, hungarian
+from src.models.graph import Graph
+from src.models.matching import Matching
+from src.models.constants import *
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Positions of counters filled by complete_matching_kernel
+AUGMENTATIONS, LABEL_MODIFICATIONS, VISITED_WELLS, TREE_REBUILDS, DELTA_SUM = range(5)
+
+
+def jit(function):
+    '''
+    Compiles function with numba if it is available, machine code is cached on disk so
+    that it is compiled only once per environment (and integer type of the graph).
+    '''
+    return njit(cache=True, nogil=True)(function) if NUMBA_AVAILABLE else function
+
+
+@jit
+def add_to_alternating_tree_kernel(well, previous_well_of_well, cost_table, well_origin, label_well, label_house, S, previous_well, slack, slack_matching_well):
+    S[well] = TRUE
+    previous_well[well] = previous_well_of_well
+
+    row = well_origin[well]
+    for house in range(len(label_house)):
+        difference = label_well[well] + label_house[house] - cost_table[row, house]
+        if difference < slack[house]:
+            slack[house] = difference
+            slack_matching_well[house] = well
+
+
+@jit
+def find_augmenting_path_kernel(cost_table, well_origin, label_well, label_house, matching_well, S, T, queue, pointers, previous_well, slack, slack_matching_well):
+    '''
+    Kernel of find_augmenting_path, pointers hold (read, write) positions of the queue.
+    Returns (last well, last house), house is UNKNOWN_NODE if no path was found.
+    '''
+    while pointers[0] < pointers[1]:
+        well = queue[pointers[0]]
+        pointers[0] += 1
+        row = well_origin[well]
+
+        for house in range(len(label_house)):
+            if cost_table[row, house] == label_well[well] + label_house[house] and T[house] == FALSE:
+                if matching_well[house] == UNMATCHED_NODE:
+                    return well, house
+                T[house] = TRUE
+                queue[pointers[1]] = matching_well[house]
+                pointers[1] += 1
+                add_to_alternating_tree_kernel(
+                    matching_well[house], well, cost_table, well_origin, label_well, label_house, S, previous_well, slack, slack_matching_well
+                )
+
+    return UNKNOWN_NODE, UNKNOWN_NODE
+
+
+@jit
+def label_modification_kernel(label_well, label_house, S, T, slack):
+    '''
+    Kernel of label_modification. Returns the applied delta.
+    '''
+    delta = np.iinfo(np.int64).max
+    for house in range(len(label_house)):
+        if T[house] == FALSE and slack[house] < delta:
+            delta = slack[house]
+
+    for well in range(len(label_well)):
+        if S[well] == TRUE:
+            label_well[well] -= delta
+
+    for house in range(len(label_house)):
+        if T[house] == TRUE:
+            label_house[house] += delta
+        else:
+            slack[house] -= delta
+
+    return delta
+
+
+@jit
+def refine_augmenting_tree_with_new_edges_kernel(cost_table, well_origin, label_well, label_house, matching_well, S, T, queue, pointers, previous_well, slack, slack_matching_well):
+    '''
+    Kernel of refine_augmenting_tree_with_new_edges.
+    Returns (last well, last house), house is UNKNOWN_NODE if no path was found.
+    '''
+    pointers[0] = 0
+    pointers[1] = 0
+    for house in range(len(label_house)):
+        if T[house] == FALSE and slack[house] == 0:
+            if matching_well[house] == UNMATCHED_NODE:
+                return slack_matching_well[house], house
+
+            T[house] = TRUE
+            well = matching_well[house]
+            if S[well] == FALSE:
+                queue[pointers[1]] = well
+                pointers[1] += 1
+                add_to_alternating_tree_kernel(
+                    well, slack_matching_well[house], cost_table, well_origin, label_well, label_house, S, previous_well, slack, slack_matching_well
+                )
+
+    return UNKNOWN_NODE, UNKNOWN_NODE
+
+
+@jit
+def matching_modification_kernel(well, house, previous_well, matching_house, matching_well):
+    current_well, current_house = well, house
+    while current_well != ROOT_NODE:
+        target_house = matching_house[current_well]
+        matching_well[current_house] = current_well
+        matching_house[current_well] = current_house
+        current_well, current_house = previous_well[current_well], target_house
+
+
+@jit
+def complete_matching_kernel(cost_table, well_origin, label_well, label_house, matching_house, matching_well, S, T, queue, previous_well, slack, slack_matching_well, counters, max_augmentations):
+    '''
+    Kernel of complete_matching (steps 4-10 of hungarian algorithm), stops after
+    max_augmentations augmentations. Work done is added to the counters. Returns size of
+    the matching.
+    '''
+    n = len(matching_house)
+    matched_count = 0
+    for well in range(n):
+        if matching_house[well] != UNMATCHED_NODE:
+            matched_count += 1
+
+    pointers = np.zeros(2, dtype=np.int64)
+    augmentations = 0
+    while matched_count < n and augmentations < max_augmentations:
+        # Step 5: Reset alternating tree
+        previous_well[:] = UNKNOWN_NODE
+        S[:] = FALSE
+        T[:] = FALSE
+        counters[TREE_REBUILDS] += 1
+
+        # Step 6: Find the starting well for the search of augmenting path
+        root = 0
+        while matching_house[root] != UNMATCHED_NODE:
+            root += 1
+        queue[0] = root
+        pointers[0] = 0
+        pointers[1] = 1
+        previous_well[root] = ROOT_NODE
+        S[root] = TRUE
+
+        # Step 7: Construct equality graph (initialize slack)
+        row = well_origin[root]
+        for house in range(n):
+            slack[house] = label_well[root] + label_house[house] - cost_table[row, house]
+            slack_matching_well[house] = root
+
+        while True:
+            # Step 8: Construct augmenting path
+            visited_before = pointers[0]
+            well, house = find_augmenting_path_kernel(
+                cost_table, well_origin, label_well, label_house, matching_well, S, T, queue, pointers, previous_well, slack, slack_matching_well
+            )
+            counters[VISITED_WELLS] += pointers[0] - visited_before
+
+            if house == UNKNOWN_NODE:
+                # Step 9: Label modification
+                counters[DELTA_SUM] += label_modification_kernel(label_well, label_house, S, T, slack)
+                counters[LABEL_MODIFICATIONS] += 1
+                well, house = refine_augmenting_tree_with_new_edges_kernel(
+                    cost_table, well_origin, label_well, label_house, matching_well, S, T, queue, pointers, previous_well, slack, slack_matching_well
+                )
+
+            if house != UNKNOWN_NODE:
+                break
+
+        # Step 10: Matching modification
+        matching_modification_kernel(well, house, previous_well, matching_house, matching_well)
+        matched_count += 1
+        augmentations += 1
+        counters[AUGMENTATIONS] += 1
+
+    return matched_count
+
+
+def hungarian_numba(duplicate_graph: Graph) -> Matching:
+    '''
+    Method runs hungarian algorithm with the inner loops compiled by numba. The algorithm
+    is the same as of hungarian, so is the resulting matching. Falls back to the
+    vectorized hungarian if numba is not installed. If statistics of the graph have
+    a callback, the kernel returns after every augmentation and the callback is called
+    between augmentations, otherwise the matching is completed by a single kernel call.
+
+    Parameters:
+    ----------
+    duplicate_graph : Graph
+        graph with duplicated wells
+
+    Returns:
+    -------
+    Optimal matching.
+    '''
+    if not NUMBA_AVAILABLE:
+        return hungarian(duplicate_graph)
+
+    graph = duplicate_graph
+    M = Matching(graph.n)
+    graph.initial_labeling()
+    M = greedy_matching(graph, M)
+    graph.clean_alternating_tree()
+
+    statistics = graph.statistics
+    step = 1 if statistics is not None and statistics.callback is not None else graph.n
+    counters = np.zeros(5, dtype=np.int64)
+    while True:
+        M.matched_count = complete_matching_kernel(
+            graph.cost_table, graph.well_origin, graph.label_well, graph.label_house, M.matching_house, M.matching_well,
+            graph.S, graph.T, graph.queue, graph.previous_well, graph.slack, graph.slack_matching_well, counters, step
+        )
+
+        if statistics is not None:
+            statistics.augmentations += int(counters[AUGMENTATIONS])
+            statistics.label_modifications += int(counters[LABEL_MODIFICATIONS])
+            statistics.visited_wells += int(counters[VISITED_WELLS])
+            statistics.tree_rebuilds += int(counters[TREE_REBUILDS])
+            statistics.delta_sum += int(counters[DELTA_SUM])
+            statistics.matched_count = M.matched_count
+            if statistics.callback is not None and counters[AUGMENTATIONS] > 0:
+                statistics.callback(statistics)
+            counters[:] = 0
+
+        if M.matched_count == graph.n:
+            break
+
+    return M
@@ -0,0 +1,304 @@
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from src.hungryryan import solve
+from src.models.graph import InitialGraph
+from src.models.matching import Matching
+from src.models.constants import *
+
+Cell = Tuple[np.ndarray, np.ndarray]
+
+
+def partition(initial_graph: InitialGraph, cell_wells: int = PARTITION_CELL_WELLS) -> List[Cell]:
+    '''
+    Method partitions the graph by recursive bisection into spatial cells of at most
+    cell_wells wells. Wells are split in half along the longer side of the region and
+    houses along the same axis so that each part holds exactly k houses per well, thus
+    every cell is a separate (balanced) instance of the problem.
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses
+    cell_wells : int, optional
+        maximal number of wells of a cell, by default PARTITION_CELL_WELLS
+
+    Returns:
+    -------
+    List of cells given as (wells, houses) indices.
+    '''
+    wells_coordinates = np.asarray(initial_graph.wells_coordinates)
+    houses_coordinates = np.asarray(initial_graph.houses_coordinates)
+    k = initial_graph.k
+
+    cells = []
+    nodes = [(np.arange(initial_graph.n), np.arange(initial_graph.n * k))]
+    while nodes:
+        wells, houses = nodes.pop()
+        if len(wells) <= cell_wells:
+            cells.append((wells, houses))
+            continue
+
+        points = np.concatenate([wells_coordinates[wells], houses_coordinates[houses]])
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+
+        wells = wells[np.argsort(wells_coordinates[wells, axis], kind='stable')]
+        houses = houses[np.argsort(houses_coordinates[houses, axis], kind='stable')]
+        middle = len(wells) // 2
+        nodes.append((wells[:middle], houses[:middle * k]))
+        nodes.append((wells[middle:], houses[middle * k:]))
+
+    return cells
+
+
+def repair_groups(wells_coordinates: np.ndarray, cell_wells: int, shift: float) -> List[np.ndarray]:
+    '''
+    Method groups wells into a grid of columns and rows with equal number of wells, which
+    is shifted by given fraction of a cell, so that boundaries of the groups cross the
+    cells of the partition.
+
+    Parameters:
+    ----------
+    wells_coordinates : np.ndarray
+        array of shape (n, 2) with coordinates of wells
+    cell_wells : int
+        maximal number of wells of a group
+    shift : float
+        offset of the grid as a fraction of a cell, from [0, 1)
+
+    Returns:
+    -------
+    List of groups of wells indices.
+    '''
+    def split(indices, axis, parts):
+        indices = indices[np.argsort(wells_coordinates[indices, axis], kind='stable')]
+        cuts = sorted({0, len(indices)} | {int(len(indices) * (part + shift) / parts) for part in range(parts)})
+        return [indices[start:end] for start, end in zip(cuts, cuts[1:]) if end > start]
+
+    n = len(wells_coordinates)
+    columns = max(1, round(math.sqrt(n / cell_wells)))
+
+    groups = []
+    for column in split(np.arange(n), 0, columns):
+        groups.extend(split(column, 1, math.ceil(len(column) / cell_wells)))
+    return groups
+
+
+def solve_cell(wells_coordinates: np.ndarray, houses_coordinates: np.ndarray, k: int, solver: str) -> np.ndarray:
+    '''
+    Method solves a single cell (run in worker process).
+
+    Returns:
+    -------
+    Houses of well duplicates of the cell.
+    '''
+    return solve(wells_coordinates, houses_coordinates, k, solver).matching.matching_house
+
+
+def candidate_table(initial_graph: InitialGraph, edge_wells: np.ndarray, edge_houses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Method arranges candidate edges into rows of their houses, padded with infinite costs.
+
+    Returns:
+    -------
+    Tuple (wells, integer distances) of arrays of shape (houses, largest number of
+    candidate edges of a house).
+    '''
+    houses_count = len(initial_graph.houses_coordinates)
+    order = np.argsort(edge_houses, kind='stable')
+    edge_wells, edge_houses = edge_wells[order], edge_houses[order]
+
+    degree = int(np.bincount(edge_houses, minlength=houses_count).max())
+    column = np.arange(len(edge_houses)) - np.searchsorted(edge_houses, edge_houses)
+    wells = np.zeros((houses_count, degree), dtype=np.int64)
+    costs = np.full((houses_count, degree), np.inf)
+    wells[edge_houses, column] = edge_wells
+    costs[edge_houses, column] = InitialGraph.pair_distances(
+        np.asarray(initial_graph.wells_coordinates)[edge_wells], np.asarray(initial_graph.houses_coordinates)[edge_houses]
+    )
+    return wells, costs
+
+
+def price_houses(initial_graph: InitialGraph, well_duals: np.ndarray, chunk_size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Method finds for every house the well of the smallest distance reduced by well duals
+    among all wells. Distances are computed chunk of wells at a time, so that temporary
+    arrays hold at most DISTANCE_CHUNK_ELEMENTS elements by default.
+
+    Returns:
+    -------
+    Tuple (smallest reduced distance of every house, well of the smallest reduced distance).
+    '''
+    houses_count = len(initial_graph.houses_coordinates)
+    if chunk_size is None:
+        chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(houses_count, 1))
+
+    reduced_minimum = np.full(houses_count, np.inf)
+    nearest_well = np.zeros(houses_count, dtype=np.int64)
+    for start in range(0, initial_graph.n, chunk_size):
+        end = min(start + chunk_size, initial_graph.n)
+        reduced = InitialGraph.distances(initial_graph.wells_coordinates[start:end], initial_graph.houses_coordinates).astype(np.float64)
+        reduced -= well_duals[start:end, np.newaxis]
+
+        wells = reduced.argmin(axis=0)
+        minimum = reduced[wells, np.arange(houses_count)]
+        closer = minimum < reduced_minimum
+        reduced_minimum[closer] = minimum[closer]
+        nearest_well[closer] = wells[closer] + start
+
+    return reduced_minimum, nearest_well
+
+
+def lower_bound(initial_graph: InitialGraph,
+                matching: Matching,
+                iterations: int = LOWER_BOUND_ITERATIONS,
+                pricing_rounds: int = LOWER_BOUND_PRICING_ROUNDS) -> int:
+    '''
+    Method computes lower bound of the total (integer) distance by lagrangian relaxation
+    of capacities of wells - for any well duals v, k * sum(v) plus the sum over houses of
+    the smallest d(w, h) - v(w) bounds the optimal total from below. Duals are improved by
+    subgradient steps on a sparse set of candidate edges (nearest neighbours and edges of
+    the matching), then the bound of the best duals is evaluated over all pairs and every
+    house reached cheaper by an omitted edge gets it as a candidate (as in
+    price_omitted_edges). Only bounds evaluated over all pairs are reported.
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses
+    matching : Matching
+        perfect matching, its total distance is used for the length of subgradient steps
+    iterations : int, optional
+        number of subgradient steps between pricing passes, by default LOWER_BOUND_ITERATIONS
+    pricing_rounds : int, optional
+        largest number of pricing passes over all pairs, by default LOWER_BOUND_PRICING_ROUNDS
+
+    Returns:
+    -------
+    Lower bound of the optimal total distance.
+    '''
+    n, k = initial_graph.n, initial_graph.k
+    houses_count = n * k
+    if houses_count == 0:
+        return 0
+
+    assigned_wells = np.asarray(matching.matching_well) // k
+    upper_bound = float(InitialGraph.pair_distances(
+        np.asarray(initial_graph.wells_coordinates)[assigned_wells], np.asarray(initial_graph.houses_coordinates)
+    ).sum())
+
+    # with edges of the matching the bound on candidates never exceeds the upper bound
+    edge_wells, edge_houses = initial_graph.candidate_edges(SPARSE_HOUSE_NEIGHBOURS, SPARSE_WELL_NEIGHBOURS_FACTOR * k)
+    keys = np.union1d(edge_wells * houses_count + edge_houses, assigned_wells * houses_count + np.arange(houses_count))
+
+    well_duals, best = np.zeros(n), -np.inf
+    for _ in range(pricing_rounds):
+        wells, costs = candidate_table(initial_graph, keys // houses_count, keys % houses_count)
+
+        duals, candidate_best, step_scale, stalled = well_duals, -np.inf, 1.0, 0
+        for _ in range(iterations):
+            reduced = costs - duals[wells]
+            nearest = reduced.argmin(axis=1)
+            bound = k * duals.sum() + reduced[np.arange(houses_count), nearest].sum()
+            if bound > candidate_best:
+                candidate_best, well_duals, stalled = bound, duals, 0
+            else:
+                # steps are shortened when the bound stops growing
+                stalled += 1
+                if stalled == LOWER_BOUND_STALLED_STEPS:
+                    step_scale, stalled = step_scale / 2, 0
+
+            subgradient = k - np.bincount(wells[np.arange(houses_count), nearest], minlength=n)
+            norm = float((subgradient * subgradient).sum())
+            if norm == 0 or bound >= upper_bound:
+                break
+            duals = duals + step_scale * (upper_bound - bound) / norm * subgradient
+
+        reduced_minimum, nearest_well = price_houses(initial_graph, well_duals)
+        best = max(best, k * well_duals.sum() + reduced_minimum.sum())
+
+        omitted = np.flatnonzero(reduced_minimum < (costs - well_duals[wells]).min(axis=1))
+        if len(omitted) == 0:
+            break
+        keys = np.union1d(keys, nearest_well[omitted] * houses_count + omitted)
+
+    # distances are integers, so is the optimal total
+    return math.ceil(best - ROUNDING_TOLERANCE * max(abs(best), 1))
+
+
+def solve_partitioned(initial_graph: InitialGraph,
+                      cell_wells: int = PARTITION_CELL_WELLS,
+                      solver: str = PARTITION_SOLVER,
+                      workers: Optional[int] = None,
+                      bound_iterations: Optional[int] = LOWER_BOUND_ITERATIONS) -> Tuple[Matching, Optional[int]]:
+    '''
+    Method solves the problem approximately: the graph is partitioned into spatial cells
+    solved independently in worker processes, then boundaries of the cells are repaired by
+    re-solving groups of wells together with their houses on grids shifted against the
+    cells (see PARTITION_REPAIR_SHIFTS). Each group is a closed instance, so repair never
+    increases the total distance.
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses (wells are not duplicated)
+    cell_wells : int, optional
+        maximal number of wells of a cell, by default PARTITION_CELL_WELLS
+    solver : str, optional
+        solver backend of cells and groups, by default PARTITION_SOLVER
+    workers : int, optional
+        number of worker processes, by default number of processors
+    bound_iterations : int, optional
+        number of subgradient steps of the lower bound between its pricing passes, by
+        default LOWER_BOUND_ITERATIONS, None if the lower bound should not be computed
+
+    Returns:
+    -------
+    Tuple (matching, lower bound of the optimal total integer distance or None).
+    '''
+    n, k = initial_graph.n, initial_graph.k
+    wells_coordinates = np.asarray(initial_graph.wells_coordinates)
+    houses_coordinates = np.asarray(initial_graph.houses_coordinates)
+
+    cells = partition(initial_graph, cell_wells)
+    houses_of_well = np.empty((n, k), dtype=np.int64)
+
+    def solve_all(executor, instances):
+        arguments = [(wells_coordinates[wells], houses_coordinates[houses], k, solver) for wells, houses in instances]
+        if executor is None:
+            return [solve_cell(*argument) for argument in arguments]
+        return list(executor.map(solve_cell, *zip(*arguments)))
+
+    executor = ProcessPoolExecutor(max_workers=workers) if len(cells) > 1 else None
+    try:
+        for (wells, houses), matching_house in zip(cells, solve_all(executor, cells)):
+            houses_of_well[wells] = houses[matching_house].reshape(-1, k)
+
+        if executor is not None:
+            for shift in PARTITION_REPAIR_SHIFTS:
+                groups = [(wells, houses_of_well[wells].ravel()) for wells in repair_groups(wells_coordinates, cell_wells, shift)]
+                for (wells, houses), matching_house in zip(groups, solve_all(executor, groups)):
+                    houses_of_well[wells] = houses[matching_house].reshape(-1, k)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    M = Matching(n * k)
+    M.matching_house[:] = houses_of_well.ravel()
+    M.matching_well[M.matching_house] = np.arange(n * k)
+    M.matched_count = n * k
+
+    if bound_iterations is None:
+        return M, None
+
+    return M, lower_bound(initial_graph, M, bound_iterations)
+
+
+def partitioned(initial_graph: InitialGraph) -> Matching:
+    '''
+    Method solves the problem approximately with the partitioned mode (see solve_partitioned).
+    '''
+    matching, _ = solve_partitioned(initial_graph, bound_iterations=None)
+    return matching
@@ -0,0 +1,144 @@
+import numpy as np
+
+from src.models.graph import Graph
+from src.models.matching import Matching
+from src.models.constants import *
+from src.solvers.auction import bidding
+
+# Factor by which epsilon is divided between consecutive scaling phases (refines)
+PUSH_RELABEL_EPSILON_FACTOR = 16
+# Number of double pushes (as a fraction of the number of well duplicates) after which prices are updated globally
+PUSH_RELABEL_UPDATE_PUSHES = 0.1
+
+
+def global_price_update(benefits: np.ndarray, prices: np.ndarray, well_origin: np.ndarray, epsilon: int, matching: Matching) -> None:
+    '''
+    Method raises price of every house by its distance to the nearest free house in the
+    residual graph, so that wells stop pushing towards houses from which no augmenting
+    path leads to a free house. Moving the well owning house h to house h' has length
+    (b(w, h) - p(h)) - (b(w, h') - p(h')) + epsilon, which is non-negative by
+    epsilon-complementary slackness. Lengths are rounded down to multiples of epsilon,
+    so that distances are computed level by level (as with buckets of Dial's algorithm)
+    and the updated prices still keep epsilon-complementary slackness.
+
+    Parameters:
+    ----------
+    benefits : np.ndarray
+        array of shape (n // k, n) with scaled benefits of original wells
+    prices : np.ndarray
+        current prices of houses, updated in place
+    well_origin : np.ndarray
+        index of the original well of every duplicate
+    epsilon : int
+        epsilon of the current scaling phase
+    matching : Matching
+        current (partial) matching
+    '''
+    n = len(prices)
+    owners = matching.matching_well
+    matched = np.flatnonzero(owners != UNMATCHED_NODE)
+    if len(matched) == 0 or len(matched) == n:
+        return
+
+    origins = well_origin[owners[matched]]
+    values = benefits[origins, matched] - prices[matched]
+
+    distances = np.zeros(n, dtype=np.int64)
+    tentative = np.full(len(matched), np.iinfo(np.int64).max, dtype=np.int64)
+    unsettled = np.arange(len(matched))
+    frontier = np.flatnonzero(owners == UNMATCHED_NODE)
+    level = 0
+
+    chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(len(benefits), 1))
+    while len(unsettled) > 0:
+        # best value of every original well among the houses of the frontier
+        best = np.full(len(benefits), np.iinfo(np.int64).min, dtype=np.int64)
+        for start in range(0, len(frontier), chunk_size):
+            houses = frontier[start:start + chunk_size]
+            np.maximum(best, (benefits[:, houses] - prices[houses]).max(axis=1), out=best)
+
+        lengths = (values[unsettled] - best[origins[unsettled]] + epsilon) // epsilon * epsilon
+        tentative[unsettled] = np.minimum(tentative[unsettled], level + lengths)
+
+        level = int(tentative[unsettled].min())
+        reached = tentative[unsettled] == level
+        frontier = matched[unsettled[reached]]
+        distances[frontier] = level
+        unsettled = unsettled[~reached]
+
+    prices += distances
+
+
+def refine(benefits: np.ndarray, prices: np.ndarray, well_origin: np.ndarray, epsilon: int, matching: Matching) -> None:
+    '''
+    Method runs a single scaling phase - starting from empty assignment, every well
+    duplicate with excess pushes it to its best house and the previous owner of the house
+    gets the excess back (double push), while the price of the house is relabelled to
+    keep epsilon-complementary slackness. Pushes of all active duplicates are done at
+    once (see bidding), prices are updated globally after every PUSH_RELABEL_UPDATE_PUSHES
+    pushes per duplicate.
+    '''
+    n = matching.n
+    matching.matching_house[:] = UNMATCHED_NODE
+    matching.matching_well[:] = UNMATCHED_NODE
+
+    pushes = 0
+    active = np.arange(n)
+    while len(active) > 0:
+        if pushes >= PUSH_RELABEL_UPDATE_PUSHES * n:
+            global_price_update(benefits, prices, well_origin, epsilon, matching)
+            pushes = 0
+
+        active, houses, bids = bidding(benefits, prices, well_origin, active, epsilon)
+        pushes += len(active)
+
+        # every house is taken by its highest relabel (lowest well on ties)
+        order = np.lexsort((active, -bids, houses))
+        pushed_houses, first = np.unique(houses[order], return_index=True)
+        pushing = active[order[first]]
+
+        previous_wells = matching.matching_well[pushed_houses]
+        returned = previous_wells[previous_wells != UNMATCHED_NODE]
+        matching.matching_house[returned] = UNMATCHED_NODE
+
+        matching.matching_well[pushed_houses] = pushing
+        matching.matching_house[pushing] = pushed_houses
+        prices[pushed_houses] = bids[order[first]]
+
+        active = np.flatnonzero(matching.matching_house == UNMATCHED_NODE)
+
+
+def push_relabel(graph: Graph) -> Matching:
+    '''
+    Method solves the assignment problem with cost-scaling push-relabel algorithm of
+    Goldberg and Kennedy, with double pushes and global price updates. Benefits are
+    multiplied by (n + 1), so that final epsilon equal to 1 is smaller than 1/n of the
+    original integer costs, which guarantees optimality.
+
+    Parameters:
+    ----------
+    graph : Graph
+        graph with duplicated wells (only its compact cost table is used)
+
+    Returns:
+    -------
+    Optimal matching.
+    '''
+    n = graph.n
+    matching = Matching(n)
+    if n == 0:
+        return matching
+
+    benefits = graph.cost_table.astype(np.int64) * (n + 1)
+    prices = np.zeros(n, dtype=np.int64)
+
+    epsilon = max(1, int(benefits.max()) // PUSH_RELABEL_EPSILON_FACTOR)
+    while True:
+        refine(benefits, prices, graph.well_origin, epsilon, matching)
+        if epsilon == 1:
+            break
+        epsilon = max(1, epsilon // PUSH_RELABEL_EPSILON_FACTOR)
+
+    matching.matched_count = n
+
+    return matching
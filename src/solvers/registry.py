@@ -0,0 +1,99 @@
+import importlib
+from typing import Callable, Dict, List, Union
+
+from src.models.graph import Graph
+from src.models.matching import Matching
+
+Solver = Callable[[Graph], Matching]
+
+DEFAULT_SOLVER = "hungarian"
+
+# Built-in backends are referenced as "module:function" and imported only when selected
+SOLVERS: Dict[str, Union[str, Solver]] = {
+    "hungarian": "src.hungryryan:hungarian",
+    "hungarian_classic": "src.hungryryan:hungarian_classic",
+    "hungarian_numba": "src.solvers.numba_hungarian:hungarian_numba",
+    "jonker_volgenant": "src.solvers.jonker_volgenant:jonker_volgenant",
+    "auction": "src.solvers.auction:auction",
+    "push_relabel": "src.solvers.push_relabel:push_relabel",
+    "min_cost_flow": "src.solvers.min_cost_flow:min_cost_flow",
+    "sparse": "src.solvers.sparse:sparse_min_cost_flow",
+    "partitioned": "src.solvers.partitioned:partitioned",
+    "heuristic": "src.solvers.heuristic:heuristic",
+}
+
+# Backends taking InitialGraph directly, without duplicate_wells and the cost table of Graph
+INITIAL_GRAPH_SOLVERS = {"sparse", "partitioned", "heuristic"}
+
+# Backends leaving optimal dual labels in Graph.label_well and Graph.label_house
+LABELLING_SOLVERS = {"hungarian", "hungarian_classic", "hungarian_numba"}
+
+
+def register_solver(name: str, solver: Union[str, Solver], initial_graph: bool = False, labels: bool = False) -> None:
+    '''
+    Method registers solver backend under given name.
+
+    Parameters:
+    ----------
+    name : str
+        name under which the solver is selectable
+    solver : Union[str, Solver]
+        function taking graph with duplicated wells and returning perfect Matching,
+        or its "module:function" import path
+    initial_graph : bool, optional
+        whether the solver takes InitialGraph instead of graph with duplicated wells
+    labels : bool, optional
+        whether the solver leaves optimal dual labels in the graph
+    '''
+    SOLVERS[name] = solver
+    for flag, solvers in ((initial_graph, INITIAL_GRAPH_SOLVERS), (labels, LABELLING_SOLVERS)):
+        if flag:
+            solvers.add(name)
+        else:
+            solvers.discard(name)
+
+
+def solves_initial_graph(name: str) -> bool:
+    '''
+    Method checks if solver registered under given name takes InitialGraph directly.
+    '''
+    return name in INITIAL_GRAPH_SOLVERS
+
+
+def provides_labels(name: str) -> bool:
+    '''
+    Method checks if solver registered under given name leaves dual labels in the graph.
+    '''
+    return name in LABELLING_SOLVERS
+
+
+def available_solvers() -> List[str]:
+    '''
+    Method returns names of all registered solver backends.
+    '''
+    return list(SOLVERS)
+
+
+def get_solver(name: str) -> Solver:
+    '''
+    Method returns solver backend registered under given name.
+
+    Parameters:
+    ----------
+    name : str
+        name of the solver backend
+
+    Returns:
+    -------
+    Function taking graph with duplicated wells and returning perfect Matching.
+    '''
+    if name not in SOLVERS:
+        raise NotImplementedError(f"{name} solver not implemented")
+
+    solver = SOLVERS[name]
+    if isinstance(solver, str):
+        module_name, function_name = solver.split(":")
+        solver = getattr(importlib.import_module(module_name), function_name)
+        SOLVERS[name] = solver
+
+    return solver
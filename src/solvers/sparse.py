@@ -0,0 +1,98 @@
+import numpy as np
+from typing import Optional, Tuple
+
+from src.models.graph import InitialGraph
+from src.models.matching import Matching
+from src.models.constants import *
+from src.solvers.min_cost_flow import SparseFlowNetwork
+
+
+def price_omitted_edges(initial_graph: InitialGraph, network: SparseFlowNetwork, chunk_size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Method performs dual pricing over all (well, house) pairs. Potentials of the solved
+    sparse network certify optimality on the complete network if no edge has negative
+    reduced cost - edges of the sparse network never have, so every violator is an
+    omitted edge. Distances are computed chunk of wells at a time.
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses
+    network : SparseFlowNetwork
+        network with full optimal flow on candidate edges
+    chunk_size : int, optional
+        number of wells priced at once, by default chosen so that temporary
+        arrays hold at most DISTANCE_CHUNK_ELEMENTS elements
+
+    Returns:
+    -------
+    Tuple (wells, houses) of edges with negative reduced cost.
+    '''
+    houses_count = len(initial_graph.houses_coordinates)
+    if chunk_size is None:
+        chunk_size = max(1, DISTANCE_CHUNK_ELEMENTS // max(houses_count, 1))
+
+    violating_wells, violating_houses = [], []
+    for start in range(0, initial_graph.n, chunk_size):
+        end = min(start + chunk_size, initial_graph.n)
+        reduced = InitialGraph.distances(initial_graph.wells_coordinates[start:end], initial_graph.houses_coordinates)
+        reduced += network.well_potential[start:end, np.newaxis]
+        reduced -= network.house_potential
+
+        wells, houses = np.nonzero(reduced < 0)
+        wells += start
+        served = network.house_owner[houses] == wells
+        violating_wells.append(wells[~served])
+        violating_houses.append(houses[~served])
+
+    return np.concatenate(violating_wells), np.concatenate(violating_houses)
+
+
+def sparse_min_cost_flow(initial_graph: InitialGraph,
+                         house_neighbours: int = SPARSE_HOUSE_NEIGHBOURS,
+                         well_neighbours: Optional[int] = None) -> Matching:
+    '''
+    Method solves the problem as min-cost flow on a sparse set of candidate edges found
+    with spatial grids, without building the cost table of all (well, house) pairs.
+    After every solve omitted edges are priced and violators are added to the candidate
+    set (re-serving only the houses they affect), until potentials prove the flow optimal
+    for the complete network. Candidate set which does not admit a full flow is enlarged
+    by connecting houses to twice as many wells.
+
+    Parameters:
+    ----------
+    initial_graph : InitialGraph
+        graph with wells and houses (wells are not duplicated)
+    house_neighbours : int, optional
+        number of nearest wells connected to every house, by default SPARSE_HOUSE_NEIGHBOURS
+    well_neighbours : int, optional
+        number of nearest houses connected to every well, by default SPARSE_WELL_NEIGHBOURS_FACTOR * k
+
+    Returns:
+    -------
+    Optimal matching, in which well w is represented by duplicates w * k ... w * k + k - 1.
+    '''
+    n, k = initial_graph.n, initial_graph.k
+    houses_count = n * k
+    if well_neighbours is None:
+        well_neighbours = SPARSE_WELL_NEIGHBOURS_FACTOR * k
+
+    def edge_costs(wells, houses):
+        return InitialGraph.pair_distances(initial_graph.wells_coordinates[wells], initial_graph.houses_coordinates[houses])
+
+    edge_wells, edge_houses = initial_graph.candidate_edges(house_neighbours, well_neighbours)
+    network = SparseFlowNetwork(n, houses_count, k, edge_wells, edge_houses, edge_costs(edge_wells, edge_houses))
+    feasible = network.solve()
+
+    while True:
+        if not feasible:
+            house_neighbours, well_neighbours = 2 * house_neighbours, 2 * well_neighbours
+            new_wells, new_houses = initial_graph.candidate_edges(house_neighbours, well_neighbours)
+        else:
+            new_wells, new_houses = price_omitted_edges(initial_graph, network)
+            if len(new_wells) == 0:
+                return network.matching()
+
+        # flow and potentials are kept, only houses violating the new edges are re-augmented
+        network.add_edges(new_wells, new_houses, edge_costs(new_wells, new_houses))
+        feasible = network.complete()
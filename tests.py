@@ -1,7 +1,7 @@
 import os
-import timeit
-import numpy as np
 
+from src.benchmark.results import measurements_grid, write_results
+from src.benchmark.runner import run_benchmark
 from src.helpers.input_handler import generate_input
 from src.helpers.output_handler import write_to_output
 from src.helpers.plot import save_output, save_time_complexity
@@ -14,6 +14,10 @@ DISPLAY_COMPLEXITY_INSTEAD_OF_SAVE = True
 SMOOTH_TIME_COMPLEXITY = False
 
 REPEAT_BENCHMARK_TIMES = 10
+BENCHMARK_SEED = 0
+# Number of benchmark worker processes (None for number of processors), each pinned to its own processor if enabled
+BENCHMARK_WORKERS = None
+PIN_BENCHMARK_CPUS = True
 REGENERATE_ALL = True
 REGENERATE = [
     # (5,5)
@@ -21,11 +25,115 @@ REGENERATE = [
 RUN_ONLY = [
     # (30, 30)
 ]
+# Backends whose total cost is verified against the hungarian algorithm on every test input
+COMPARE_SOLVERS = [
+    "jonker_volgenant",
+    "auction",
+    "push_relabel",
+    "min_cost_flow",
+    "sparse",
+]
+# (family, N, K) of instances on which the heuristic solver has to be faster than the exact sparse solver
+HEURISTIC_FASTER_CASES = [
+    ("skewed", 200, 20),
+    ("uniform", 300, 30),
+]
 
 def test_hungarian(input_file):
     from src.hungryryan import run_hungryryan
     return run_hungryryan(input_file)
 
+def compare_solvers(input_file):
+    from src.hungryryan import duplicate_wells
+    from src.helpers.input_handler import read_input
+    from src.solvers.registry import get_solver, solves_initial_graph
+
+    def total_cost(solver):
+        initial_graph = read_input(input_file)
+        graph = duplicate_wells(initial_graph)
+        matching = get_solver(solver)(initial_graph if solves_initial_graph(solver) else graph)
+        return graph.cost_table[graph.well_origin, matching.matching_house].sum()
+
+    expected = total_cost("hungarian")
+    for solver in COMPARE_SOLVERS:
+        actual = total_cost(solver)
+        assert actual == expected, f"{solver} total cost {actual} differs from hungarian {expected} for {input_file}"
+
+def check_warm_start(input_file):
+    from src.hungryryan import duplicate_wells, hungarian, resolve_hungarian, solve
+    from src.helpers.input_handler import read_input
+    from src.models.instance_delta import InstanceDelta
+    from src.models.solution import Solution
+
+    initial_graph = read_input(input_file)
+    graph = duplicate_wells(initial_graph)
+    matching = hungarian(graph)
+
+    # move the first well and house, then add a well with its k houses in the corners of the area
+    k = initial_graph.k
+    delta = InstanceDelta(
+        moved_wells={0: (5.0, 5.0)}, moved_houses={0: (0.0, 0.0)},
+        added_wells=[(10.0, 10.0)], added_houses=[(10.0, 0.0)] * k,
+    )
+    _, resolved_matching = resolve_hungarian(graph, matching, delta)
+    edited_graph, _, _ = delta.apply(initial_graph)
+    actual = Solution(edited_graph, resolved_matching).total_cost
+    expected = solve(edited_graph.wells_coordinates, edited_graph.houses_coordinates, k, "hungarian").total_cost
+    assert actual == expected, f"warm start total cost {actual} differs from fresh solve {expected} for {input_file}"
+
+def check_binary_input(input_file, binary_file):
+    from src.helpers.input_handler import convert_input, read_input
+
+    convert_input(input_file, binary_file)
+    text_graph, binary_graph = read_input(input_file), read_input(binary_file)
+    assert (text_graph.n, text_graph.k) == (binary_graph.n, binary_graph.k), f"binary input {binary_file} has different size"
+    assert (text_graph.wells_coordinates == binary_graph.wells_coordinates).all(), f"binary input {binary_file} has different wells"
+    assert (text_graph.houses_coordinates == binary_graph.houses_coordinates).all(), f"binary input {binary_file} has different houses"
+
+def check_columnar_output(graph, matching, output_file):
+    from src.helpers.output_handler import read_output
+
+    expected = read_output(output_file)
+    for extension in (".npz", ".csv"):
+        columnar_file = os.path.splitext(output_file)[0] + extension
+        write_to_output(graph, matching, columnar_file)
+        actual = read_output(columnar_file)
+        for name, expected_column, actual_column in zip(("wells", "houses", "assignment"), expected, actual):
+            assert (expected_column == actual_column).all(), f"{name} of {columnar_file} differ from {output_file}"
+        assert actual[3] == expected[3], f"total cost {actual[3]} of {columnar_file} differs from {expected[3]} of {output_file}"
+
+def check_result_cache(input_file, cache_directory):
+    from src.hungryryan import solve_input
+    from src.helpers.result_cache import ResultCache
+    from src.models.solver_statistics import SolverStatistics
+
+    cache = ResultCache(cache_directory)
+    for solver in ("hungarian", "jonker_volgenant"):
+        missed = solve_input(input_file, solver, SolverStatistics(), cache)
+        hit = solve_input(input_file, solver, SolverStatistics(), cache)
+        assert hit.statistics is not None and hit.statistics.augmentations == 0, f"cached {solver} result for {input_file} has no zero statistics"
+        assert (hit.matching.matching_house == missed.matching.matching_house).all(), f"cached {solver} matching differs for {input_file}"
+        assert hit.total_cost == missed.total_cost, f"cached {solver} total cost {hit.total_cost} differs from {missed.total_cost} for {input_file}"
+
+def check_compare_results():
+    from src.benchmark.results import compare_results
+
+    def record(median, iqr):
+        summary = {"median": median, "q1": median - iqr / 2, "q3": median + iqr / 2, "iqr": iqr, "min": median - iqr, "max": median + iqr}
+        return {"family": "uniform", "n": 1, "k": 1, "seed": 0, "solver": "hungarian", "repeats": 5, "warmup": 1, "phases": {"total": summary}}
+
+    jitter = compare_results([record(0.00085, 0.00001)], [record(0.00117, 0.00001)])
+    assert not jitter, f"sub-millisecond jitter reported as regression: {jitter}"
+    regressions = compare_results([record(0.00085, 0.00001)], [record(0.5, 0.00001)])
+    assert len(regressions) == 1, f"slowdown from 0.00085 s to 0.5 s not reported: {regressions}"
+
+def check_heuristic_speed():
+    for family, n, k in HEURISTIC_FASTER_CASES:
+        records = run_benchmark([(n, k)], solvers=("heuristic", "sparse"), families=(family,), seed=BENCHMARK_SEED, repeats=1, warmup=0, verbose=False)
+        heuristic, sparse = (record["phases"]["solve"]["median"] for record in records)
+        print(f'[INFO] {family} N: {n}, K: {k} -> heuristic: {heuristic:.2f} s, sparse: {sparse:.2f} s')
+        assert heuristic < sparse, f"heuristic ({heuristic:.2f} s) is not faster than sparse ({sparse:.2f} s) on {family} N: {n}, K: {k}"
+
 def process_output(n, k, output_file, output_plot):
     if DISPLAY_OUTPUT_INSTEAD_OF_SAVE:
         return display_output(n, k, output_file)
@@ -98,29 +206,26 @@ def main():
                 graph, matching = test_hungarian(input_file)
                 write_to_output(graph, matching, output_file)
                 process_output(graph.n, graph.k, output_file, f"{pictures}n_{n}_k_{k}.png")
+                compare_solvers(input_file)
+                check_warm_start(input_file)
+                check_binary_input(input_file, f"./Tests/input_test_{n}_{k}.bin")
+                check_columnar_output(graph, matching, output_file)
+                check_result_cache(input_file, "./Tests/result_cache/")
 
 
     # BENCHMARKING
+    check_compare_results()
+    check_heuristic_speed()
     print(f'Benchmark N: {MAX_N}, K: {MAX_K}')
-    full_measurements = np.zeros((MAX_N, MAX_K))
-
-    for repeat in range(REPEAT_BENCHMARK_TIMES):
-        measurements = np.zeros((MAX_N, MAX_K))
-        for n in range(1, MAX_N + 1):
-            for k in range(1, MAX_K + 1):
-                print(f'({repeat+1}/{REPEAT_BENCHMARK_TIMES}) Benchmark -> N: {n}, K: {k}')
-                input_file = f"./Tests/input_test_{n}_{k}.txt"
-                output_file = f"./Tests/output_test_benchmark.txt"
-                generate_input(n, k, input_file)
-                measurement = timeit.timeit(
-                    lambda: test_hungarian(input_file),
-                    number=1
-                )
-                measurements[n-1, k-1] = measurement
-        full_measurements += measurements
-    full_measurements = full_measurements / float(max(REPEAT_BENCHMARK_TIMES, 1))
-    process_time_complexity(n, k, full_measurements, f"{pictures}standard_benchmark.png", logarithmic=False, smoothed=SMOOTH_TIME_COMPLEXITY)
-
+    sizes = [(n, k) for n in range(1, MAX_N + 1) for k in range(1, MAX_K + 1)]
+    records = run_benchmark(
+        sizes, seed=BENCHMARK_SEED, repeats=REPEAT_BENCHMARK_TIMES,
+        workers=BENCHMARK_WORKERS, pin_cpus=PIN_BENCHMARK_CPUS, input_directory=f"{tests}benchmark_inputs/"
+    )
+    write_results(records, f"{tests}standard_benchmark.json")
+
+    full_measurements = measurements_grid(records, MAX_N, MAX_K)
+    process_time_complexity(MAX_N, MAX_K, full_measurements, f"{pictures}standard_benchmark.png", logarithmic=False, smoothed=SMOOTH_TIME_COMPLEXITY)
 
 if __name__ == "__main__":
     main()